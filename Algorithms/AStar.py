@@ -1,67 +1,31 @@
 import time
 import psutil
-import copy
+from array import array
 from heapq import heappush, heappop
-from enum import Enum
 
+from Algorithms.Assignment import solveAssignment
+from Algorithms.Board import Board
+from Algorithms.NodeStore import NodeStore
+from Algorithms.PatternDatabase import PatternDatabase
+from Algorithms.TranspositionTable import TranspositionTable
 
-class Move(Enum):
-    UP = (-1, 0)
-    DOWN = (1, 0)
-    LEFT = (0, -1)
-    RIGHT = (0, 1)
-
-
-class Direction(Enum):
-    UP = "u"
-    DOWN = "d"
-    LEFT = "l"
-    RIGHT = "r"
-
-
-class Cell(Enum):
-    WALL = "#"
-    EMPTY = " "
-    PLAYER = "@"
-    STONE = "$"
-    SWITCH = "."
-    STONE_SWITCH = "*"
-    PLAYER_SWITCH = "+"
-
-
-MoveToDirection = {
-    Move.UP: Direction.UP,
-    Move.DOWN: Direction.DOWN,
-    Move.LEFT: Direction.LEFT,
-    Move.RIGHT: Direction.RIGHT,
-}
+TABLE_SIZE = 1 << 20  # Slots in the IDA* transposition table
+INITIAL_EPSILON = 3.0  # Heuristic weight of the first anytime A* search
+EPSILON_STEP = 0.5  # How much the anytime A* weight drops after every solution
 
 
 class Node:
-    def __init__(
-        self,
-        maze,
-        player_pos,
-        stones,
-        switchs,
-        g,
-        h,
-        parent,
-        direction=None,
-        is_pushing=False,
-        cost=0,
-    ):
-        self.maze = tuple(maze)
-        self.player_pos = tuple(player_pos)
-        self.stones = tuple(stones)
-        self.switchs = tuple(switchs)
+    # A node only holds the immutable board state, never the grid
+    __slots__ = ("state", "g", "h", "f", "id", "stones_h", "matching")
+
+    def __init__(self, state, g, h, id=-1, stones_h=None, matching=None):
+        self.state = state
         self.g = g
         self.h = h
         self.f = g + h
-        self.parent = parent
-        self.direction = direction
-        self.is_pushing = is_pushing
-        self.cost = cost
+        self.id = id  # Parent, move and path cost live in AStar.nodes under this id
+        self.stones_h = stones_h  # The stone assignment term of h, see stones_heuristic
+        self.matching = matching  # The assignment behind it, see solveAssignment
 
     def __lt__(self, other):
         return self.f < other.f
@@ -70,46 +34,36 @@ class Node:
 class AStar:
     def __init__(self):
         self.maze = []
-        self.player = []
+        self.board = None
         self.weight = []
-        self.stones = []
-        self.switchs = []
         self.open_set = []
-        self.closed_set = set()
+        self.best_ids = {}  # The node of the cheapest path found to every state key
+        self.nodes = None
+        self.push_costs = []
+        self.patterns = []
         self.node = 1  # Number of nodes generated -- 1 for the initial state
         self.path = None
         self.total_cost = 0
         self.time = 0
         self.memory = 0
 
-    def init_positions(self):
-        for i in range(len(self.maze)):
-            for j in range(len(self.maze[i])):
-                if self.maze[i][j] == Cell.PLAYER.value:
-                    self.player = [i, j]
-                elif self.maze[i][j] == Cell.STONE.value:
-                    self.stones.append([i, j])
-                elif self.maze[i][j] == Cell.SWITCH.value:
-                    self.switchs.append(
-                        [i, j, 0]
-                    )  # 0: nothing on switch, 1: stone on switch, 2: player on switch
-                elif self.maze[i][j] == Cell.STONE_SWITCH.value:
-                    self.stones.append([i, j])
-                    self.switchs.append([i, j, 1])
-                elif self.maze[i][j] == Cell.PLAYER_SWITCH.value:
-                    self.player = [i, j]
-                    self.switchs.append([i, j, 2])
-
-    def assign_weights_to_stones(self):
-        for i in range(len(self.stones)):
-            self.stones[i].append(self.weight[i])
-
     # Get maze from input file:
-    def input(self, weight, maze):
+    def input(self, weight, maze, engine=Board, patterns=False):
         self.weight = weight
         self.maze = maze
-        self.init_positions()
-        self.assign_weights_to_stones()
+        self.board = engine(weight, maze)
+        # Keys that are hashes keep their packed key in the node store, see
+        # state_key
+        self.nodes = NodeStore(self.board.moveType, not self.board.exactKeys)
+        # push_costs[cell][i][j]: cheapest way to push stone i from cell onto switch j
+        self.push_costs = self.board.pushCosts()
+        # patterns: (i, j, table) for disjoint pairs of stones, see PatternDatabase;
+        # left empty for mazes too large to build the tables of
+        if patterns and PatternDatabase.worthBuilding(self.board):
+            self.patterns = [
+                (i, i + 1, PatternDatabase(maze, self.board.weights[i : i + 2]))
+                for i in range(0, len(self.board.stones) - 1, 2)
+            ]
 
     def print_maze(self):
         for row in self.maze:
@@ -121,15 +75,6 @@ class AStar:
     def get_weight(self):
         return self.weight
 
-    def get_player_pos(self):
-        return self.player
-
-    def get_stones(self):
-        return self.stones
-
-    def get_switchs(self):
-        return self.switchs
-
     def get_nodes(self):
         return self.node
 
@@ -159,285 +104,110 @@ class AStar:
             self.path,
         )
 
-    def find_a_stone(self, stone_pos):
-        stone_index = -1
-        for i, stone in enumerate(self.stones):
-            if stone[0] == stone_pos[0] and stone[1] == stone_pos[1]:
-                stone_index = i
-                break
-        return stone_index
-
-    def find_a_switch(self, switch_pos):
-        switch_index = -1
-        for i, switch in enumerate(self.switchs):
-            if switch[0] == switch_pos[0] and switch[1] == switch_pos[1]:
-                switch_index = i
-                break
-        return switch_index
-
-    def is_position_switch(self, pos):
-        if self.maze[pos[0]][pos[1]] in [
-            Cell.SWITCH.value,
-            Cell.PLAYER_SWITCH.value,
-            Cell.STONE_SWITCH.value,
-        ]:
-            return True
-        return False
-
-    def is_victory(self):
-        for switch in self.switchs:
-            if switch[2] != 1:
-                return False
-        return True
-
-    def is_victory_state(self, node):
-        self.stones = node.stones
-        for switch in self.switchs:
-            if switch[2] != 1:
-                return False
-        # self.print_maze()
-        return True
-
-    # Transition state
-    def transition(self, move):
-        next_pos = [self.player[0] + move.value[0], self.player[1] + move.value[1]]
-
-        # If next move is the Wall -> Do nothing
-        if self.maze[next_pos[0]][next_pos[1]] == Cell.WALL.value:
-            return
-
-        # If next move is the Stone -> Check the following position
-        elif (
-            self.maze[next_pos[0]][next_pos[1]] == Cell.STONE.value
-            or self.maze[next_pos[0]][next_pos[1]] == Cell.STONE_SWITCH.value
-        ):
-
-            # Find which stone it is:
-            stone_index = self.find_a_stone([next_pos[0], next_pos[1]])
-            next_stone_pos = [next_pos[0] + move.value[0], next_pos[1] + move.value[1]]
-
-            # Stone heading Wall or another Stone -> Do nothing
-            if self.maze[next_stone_pos[0]][next_stone_pos[1]] in [
-                Cell.WALL.value,
-                Cell.STONE.value,
-                Cell.STONE_SWITCH.value,
-            ]:
-                return
-
-            # Stone heading Switch -> Push the stone to the switch
-            elif self.maze[next_stone_pos[0]][next_stone_pos[1]] == Cell.SWITCH.value:
-                self.maze[next_stone_pos[0]][
-                    next_stone_pos[1]
-                ] = Cell.STONE_SWITCH.value
-                switch_index = self.find_a_switch(
-                    [next_stone_pos[0], next_stone_pos[1]]
-                )
-                self.switchs[switch_index][2] = 1
-
-            # Stone heading Empty Space
-            elif self.maze[next_stone_pos[0]][next_stone_pos[1]] == Cell.EMPTY.value:
-                self.maze[next_stone_pos[0]][next_stone_pos[1]] = Cell.STONE.value
-
-            # Update stone position
-            self.stones[stone_index][:2] = next_stone_pos
-
-            if self.is_position_switch(next_pos):
-                self.maze[next_pos[0]][next_pos[1]] = Cell.PLAYER_SWITCH.value
-                switch_index = self.find_a_switch([next_pos[0], next_pos[1]])
-                self.switchs[switch_index][2] = 2
-            else:
-                self.maze[next_pos[0]][next_pos[1]] = Cell.PLAYER.value
-
-        # If next move is the Switch
-        elif self.maze[next_pos[0]][next_pos[1]] == Cell.SWITCH.value:
-            self.maze[next_pos[0]][next_pos[1]] = Cell.PLAYER_SWITCH.value
-            switch_index = self.find_a_switch([next_pos[0], next_pos[1]])
-            self.switchs[switch_index][2] = 2
-
-        # If next move is the Empty Space
-        elif self.maze[next_pos[0]][next_pos[1]] == Cell.EMPTY.value:
-            self.maze[next_pos[0]][next_pos[1]] = Cell.PLAYER.value
-
-        # Update the previous position
-        # If player was on the switch -> Update the switch
-        if self.maze[self.player[0]][self.player[1]] == Cell.PLAYER_SWITCH.value:
-            switch_index = self.find_a_switch([self.player[0], self.player[1]])
-            self.maze[self.player[0]][self.player[1]] = Cell.SWITCH.value
-            self.switchs[switch_index][2] = 0
+    def stones_heuristic(self, stones, parent_matching=None):
+        """
+        Estimate the cost of pushing the stones onto the switches.
+
+        Every push costs 1 + the stone weight, and every switch takes one stone:
+        this is the cheapest stone-to-switch assignment over true push distances.
+        When the parent's matching is given and a single stone moved, only that
+        stone is re-assigned, in O(n^2) instead of O(n^3).
+
+        Returns:
+            total (float): The estimate.
+            matching (tuple): The assignment to pass on to the children.
+        """
+        total, matching = solveAssignment(
+            [self.push_costs[stone][index] for index, stone in enumerate(stones)],
+            parent_matching,
+        )
+        if not self.patterns or total == float("inf"):
+            return total, matching
 
-        else:
-            self.maze[self.player[0]][self.player[1]] = Cell.EMPTY.value
-
-        self.player = next_pos  # Update player position
-        # print(self.get_player_pos())
-        # print(self.get_stones())
-        # print(self.get_switchs())
-        # self.print_maze()
-
-    # Calculate Manhattan Distance
-    def manhattan_distance(self, pos1, pos2):
-        return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
-
-    def is_deadlock_position(self, stone_pos):
-        x, y = stone_pos[:2]
-        maze = self.get_maze()
-
-        # 1. Corner Deadlock Check (box against two walls, and no goal in the corner)
-        if (
-            (maze[x - 1][y] == "#" and maze[x][y - 1] == "#")
-            or (maze[x - 1][y] == "#" and maze[x][y + 1] == "#")
-            or (maze[x + 1][y] == "#" and maze[x][y - 1] == "#")
-            or (maze[x + 1][y] == "#" and maze[x][y + 1] == "#")
-        ):
-            if maze[x][y] not in [Cell.STONE_SWITCH.value, Cell.SWITCH.value]:
-                return True
-
-        # 2. Wall Deadlock Check (two boxes in a row along the wall):
-        # Check if two boxes are horizontally or vertically adjacent along a wall
-        if maze[x - 1][y] == "#" or maze[x + 1][y] == "#":
-            if (
-                maze[x][y + 1] == "$"
-                and maze[x][y + 1] not in [Cell.STONE_SWITCH.value, Cell.SWITCH.value]
-                and (maze[x - 1][y + 1] == "#" or maze[x + 1][y + 1] == "#")
-            ) or (
-                maze[x][y - 1] == "$"
-                and maze[x][y - 1] not in [Cell.STONE_SWITCH.value, Cell.SWITCH.value]
-                and (maze[x - 1][y - 1] == "#" or maze[x + 1][y - 1] == "#")
-            ):
-                return True  # Horizontal wall deadlock
-
-        if maze[x][y - 1] == "#" or maze[x][y + 1] == "#":
-            if (
-                maze[x + 1][y] == "$"
-                and maze[x + 1][y] not in [Cell.STONE_SWITCH.value, Cell.SWITCH.value]
-                and (maze[x + 1][y - 1] == "#" or maze[x + 1][y + 1] == "#")
-            ) or (
-                maze[x - 1][y] == "$"
-                and maze[x - 1][y] not in [Cell.STONE_SWITCH.value, Cell.SWITCH.value]
-                and (maze[x - 1][y - 1] == "#" or maze[x - 1][y + 1] == "#")
-            ):
-                return True  # Vertical wall deadlock
-
-        return False
-
-    def heuristic_function(self):
-        player_pos = self.get_player_pos()
-        stones = self.get_stones()
-        switches = self.get_switchs()
-
-        if self.is_victory():
+        # The exact costs of disjoint pairs of stones, plus the lone last stone
+        pattern_total = sum(
+            table.cost(stones[i], stones[j]) for i, j, table in self.patterns
+        )
+        if len(stones) % 2:
+            pattern_total += min(self.push_costs[stones[-1]][len(stones) - 1])
+        return max(total, pattern_total), matching
+
+    def heuristic_function(self, state, stones_h=None):
+        """
+        Estimate the cost to the goal, reusing `stones_h` (the value of
+        `stones_heuristic` for the stones of the state) when it is known.
+        """
+        # Engines such as Bitboard and ZobristBoard carry more than (player,
+        # stones) in a state
+        player, stones = state[0], self.board.stoneCells(state)
+        if self.board.isGoal(state):
             return 0
 
-        # Check for deadlock -> If yes -> +10000000
-        for stone in stones:
-            if self.is_deadlock_position(stone):
-                return 10000000
+        if stones_h is None:
+            stones_h = self.stones_heuristic(stones)[0]
+        total_weighted_distance = stones_h
+        if total_weighted_distance == float("inf"):
+            return total_weighted_distance
 
-        # Calculate the minimum distance from player to any stone
+        # Walking is free when searching over pushes
+        if self.board.pushLevel:
+            return total_weighted_distance
+
+        # Steps to walk next to the closest stone that still has to move
+        walk_distances = self.board.walkDistances[player]
         min_player_to_stone = min(
-            self.manhattan_distance(player_pos, stone[:2]) for stone in stones
+            walk_distances[stone] for stone in stones if not self.board.switch[stone]
         )
 
-        # Calculate the sum of weighted distances from each stone to the nearest switch
-        total_weighted_distance = 0
-        for stone in stones:
-            stone_pos = stone[:2]
-            stone_weight = stone[2]
-            min_stone_to_switch = float("inf")
-            for switch in switches:
-                if switch[2] == 1:
-                    continue
-                else:
-                    min_stone_to_switch = min(
-                        self.manhattan_distance(stone_pos, switch[:2])
-                        for switch in switches
-                    )
-            total_weighted_distance += min_stone_to_switch * stone_weight
-
-        return min_player_to_stone + total_weighted_distance
-
-    def state_to_tuple(self, node):
-        return (tuple(node.player_pos), tuple(tuple(stone) for stone in node.stones))
+        return min_player_to_stone - 1 + total_weighted_distance
 
-    def reconstruct_path(self, node):
-        self.path = ""
-        while node.parent is not None:
-            self.path += (
-                MoveToDirection[node.direction].value.upper()
-                if node.is_pushing
-                else MoveToDirection[node.direction].value
+    def state_key(self, state):
+        # A key that is a hash is checked against the state of the node stored
+        # under it, see Board.checkedKey
+        key = self.board.key(state)
+        if not self.board.exactKeys and key in self.best_ids:
+            key = self.board.checkedKey(
+                key, state, self.nodes.states[self.best_ids[key]]
             )
-            self.total_cost += node.cost
-            node = node.parent
+        return key
 
-        self.path = self.path[::-1]
-        return None
+    def best_g(self, key):
+        node_id = self.best_ids.get(key)
+        return float("inf") if node_id is None else self.nodes.cost[node_id]
 
-    def is_pushing_stone(self, player_pos, move, temp_maze):
-        next_pos = [player_pos[0] + move.value[0], player_pos[1] + move.value[1]]
-        return temp_maze[next_pos[0]][next_pos[1]] in [
-            Cell.STONE.value,
-            Cell.STONE_SWITCH.value,
-        ]
+    def add_node(self, key, parent, move, node):
+        # Record the node as the cheapest path found to its state
+        state = None if self.board.exactKeys else node.state
+        node.id = self.nodes.add(parent, move, node.g, state)
+        self.best_ids[key] = node.id
 
-    def get_neighbor(self, current_node, move):
-
-        temp_maze = copy.deepcopy(self.get_maze())
-        temp_player = copy.deepcopy(self.get_player_pos())
-        temp_stones = copy.deepcopy(self.get_stones())
-        temp_switchs = copy.deepcopy(self.get_switchs())
-
-        self.transition(move)
-
-        new_maze = self.maze
-        new_player_pos = self.player
-        new_stones = self.stones
-        new_switchs = self.switchs
-
-        if self.state_to_tuple(current_node) == self.state_to_tuple(
-            Node(new_maze, new_player_pos, new_stones, new_switchs, 0, 0, None)
-        ):
-            return None  # Invalid move
-
-        # Calculating g(n), h(n):
-        g = current_node.g + 1
-        h = copy.deepcopy(self.heuristic_function())
-
-        # Calculate cost of the move:
-        # If pushing a stone, cost = 1 + weight of the stone
-        # If NOT pushing a stone, cost = 1
-        cost = 0
-        if self.is_pushing_stone(current_node.player_pos, move, temp_maze):
-            new_stone_pos = [
-                new_player_pos[0] + move.value[0],
-                new_player_pos[1] + move.value[1],
-            ]
-            stone_index = self.find_a_stone(new_stone_pos)
-            cost = 1 + self.stones[stone_index][2]  # Add weight of the stone
-        else:
-            cost = 1
-
-        neighbor = Node(
-            new_maze,
-            new_player_pos,
-            new_stones,
-            new_switchs,
-            g,
-            h,
-            current_node,
-            move,
-            self.is_pushing_stone(current_node.player_pos, move, temp_maze),
-            cost,
+    def reconstruct_path(self, node):
+        moves = self.nodes.moves(node.id)
+        self.path = self.board.pathString(moves)
+        # Every move costs 1 + the pushed weight, walks between pushes cost 1 per step
+        self.total_cost = (
+            self.nodes.cost[node.id] - self.board.moveCount(moves) + len(self.path)
         )
+        return None
 
-        self.maze = temp_maze
-        self.player = temp_player
-        self.stones = temp_stones
-        self.switchs = temp_switchs
+    def get_neighbors(self, current_node):
+        parent_stones = current_node.state[1]
+        for move, cost, state in self.board.successors(current_node.state):
+            # A move without a push keeps the very same stones tuple, and only the
+            # player term of the heuristic has to be recomputed. A push moves one
+            # stone, whose row of the parent's assignment is re-augmented
+            if state[1] is parent_stones:
+                stones_h, matching = current_node.stones_h, current_node.matching
+            else:
+                stones_h, matching = self.stones_heuristic(
+                    self.board.stoneCells(state), current_node.matching
+                )
+            h = self.heuristic_function(state, stones_h)
+            if h == float("inf"):
+                continue
 
-        self.node += 1
-        # print(f'{self.node}. -- G(n): {g} -- H(n): {h} -- F(n): {g + h}')
-        return neighbor
+            self.node += 1
+            yield move, Node(state, current_node.g + cost, h, -1, stones_h, matching)
 
     def a_star_search(self):
         # Measure start time and memory
@@ -445,34 +215,28 @@ class AStar:
         process = psutil.Process()
         start_memory = process.memory_info().rss / (1024 * 1024)
 
-        initial_maze = self.get_maze()
-        initial_player_pos = self.get_player_pos()
-        initial_stones = self.get_stones()
-        inital_switchs = self.get_switchs()
-        initial_heuristic = self.heuristic_function()
-
+        initial_state = self.board.initialState()
+        stones_h, matching = self.stones_heuristic(self.board.stoneCells(initial_state))
         start_node = Node(
-            initial_maze,
-            initial_player_pos,
-            initial_stones,
-            inital_switchs,
-            0,
-            initial_heuristic,
-            None,
-            None,
-            False,
+            initial_state,
             0,
+            self.heuristic_function(initial_state, stones_h),
+            -1,
+            stones_h,
+            matching,
         )
+        self.add_node(self.state_key(initial_state), -1, 0, start_node)
         heappush(self.open_set, start_node)
 
         while self.open_set:
             current_node = heappop(self.open_set)
-            self.maze = current_node.maze
-            self.player = current_node.player_pos
-            self.stones = current_node.stones
-            self.switchs = current_node.switchs
+            current_key = self.state_key(current_node.state)
+
+            # Lazy deletion: a cheaper copy of this state was pushed later
+            if current_node.g > self.best_g(current_key):
+                continue
 
-            if self.is_victory_state(current_node):
+            if self.board.isGoal(current_node.state):
                 # Measure end time and memory
                 end_time = time.time()
                 end_memory = process.memory_info().rss / (1024 * 1024)  # in MB
@@ -480,33 +244,177 @@ class AStar:
                 self.memory = end_memory - start_memory
                 return self.reconstruct_path(current_node)
 
-            self.closed_set.add(self.state_to_tuple(current_node))
+            for move, neighbor in self.get_neighbors(current_node):
+                neighbor_key = self.state_key(neighbor.state)
+                # Only keep the neighbor if it is the cheapest way found to its state
+                if neighbor.g < self.best_g(neighbor_key):
+                    self.add_node(neighbor_key, current_node.id, move, neighbor)
+                    heappush(self.open_set, neighbor)
+
+        # Measure end time and memory
+        end_time = time.time()
+        end_memory = process.memory_info().rss / (1024 * 1024)
+        self.time = (end_time - start_time) * 1000
+        self.memory = end_memory - start_memory
+        return None
 
-            for move in Move:
-                neighbor = self.get_neighbor(current_node, move)
-                if neighbor is None:
-                    continue
 
-                neighbor_tuple = self.state_to_tuple(neighbor)
-                if neighbor_tuple in self.closed_set:
+class IDAStar(AStar):
+    """
+    Iterative-deepening A*: repeated depth-first searches bounded by f = g + h.
+
+    Memory grows with the solution depth plus a fixed-size transposition table.
+    The table skips states already reached as cheaply in the current iteration
+    and keeps the lower bounds learned from exhausted subtrees across iterations.
+
+    Every iteration searches the whole tree below the bound again, and raises
+    the bound only to the smallest f above it, which over single steps is often
+    one more. On `Board`, the bundled mazes take from a fraction of a second to
+    about 30 seconds (input-10) and two minutes (input-09), and input-07 is out
+    of reach. Over pushes (`PushBoard`) they all take under a second.
+    """
+
+    def __init__(self, table_size=TABLE_SIZE):
+        super().__init__()
+        self.table_size = table_size
+        self.table = None
+        self.iteration = 0
+
+    def input(self, weight, maze, engine=Board, patterns=False):
+        super().input(weight, maze, engine, patterns)
+        # Keys that are hashes keep their state in the table, see lookup
+        self.table = TranspositionTable(self.table_size, not self.board.exactKeys)
+
+    def lookup(self, key, state):
+        # A key that is a hash only finds the entry of the same state, see
+        # Board.checkedKey
+        slot = self.table.lookup(key)
+        states = self.table.states
+        if slot >= 0 and states is not None:
+            if not self.board.sameState(states[slot], state):
+                return -1
+        return slot
+
+    def store(self, key, state, depth, g, h):
+        if self.board.exactKeys:
+            state = None
+        self.table.store(key, depth, g, h, self.iteration, state)
+
+    def search(self, threshold):
+        """
+        Run one depth-first iteration with the given f bound.
+
+        Returns:
+            found (bool): Whether a goal was reached, `self.path` is set if so.
+            next_threshold (float): The smallest f above the bound that was seen.
+        """
+        board = self.board
+        table = self.table
+        initial_state = board.initialState()
+        initial_key = board.key(initial_state)
+        moves = array(board.moveType)
+        # Frames are [key, g, successors, smallest f seen above the bound below it,
+        # state, stones_heuristic of its stones], the last one being None until a
+        # child needs it
+        root = [
+            initial_key,
+            0,
+            board.successors(initial_state),
+            float("inf"),
+            initial_state,
+            None,
+        ]
+        stack = [root]
+        slot = self.lookup(initial_key, initial_state)
+        if slot >= 0:
+            h = table.h[slot]
+        else:
+            root[5] = self.stones_heuristic(board.stoneCells(initial_state))
+            h = self.heuristic_function(initial_state, root[5][0])
+        self.store(initial_key, initial_state, 0, 0, h)
+
+        while stack:
+            frame = stack[-1]
+            key, g, successors = frame[0], frame[1], frame[2]
+            successor = next(successors, None)
+
+            if successor is None:
+                # Subtree exhausted: every goal below costs at least its smallest f
+                stack.pop()
+                slot = self.lookup(key, frame[4])
+                if slot >= 0 and frame[3] - g > table.h[slot]:
+                    table.h[slot] = frame[3] - g
+                if stack:
+                    moves.pop()
+                    stack[-1][3] = min(stack[-1][3], frame[3])
+                continue
+
+            move, cost, state = successor
+            new_g = g + cost
+            new_key = board.key(state)
+            # The bound learned for the state beats computing the heuristic again
+            stones_h = None
+            slot = self.lookup(new_key, state)
+            if slot >= 0:
+                h = table.h[slot]
+            else:
+                if frame[5] is None:
+                    frame[5] = self.stones_heuristic(board.stoneCells(frame[4]))
+                # Only a push changes the stones tuple, see AStar.get_neighbors
+                if state[1] is frame[4][1]:
+                    stones_h = frame[5]
+                else:
+                    stones_h = self.stones_heuristic(
+                        board.stoneCells(state), frame[5][1]
+                    )
+                h = self.heuristic_function(state, stones_h[0])
+            if new_g + h > threshold:
+                frame[3] = min(frame[3], new_g + h)
+                continue
+
+            moves.append(move)
+            self.node += 1
+            if board.isGoal(state):
+                self.path = board.pathString(moves)
+                self.total_cost = new_g - self.board.moveCount(moves) + len(self.path)
+                return True, threshold
+
+            if slot >= 0 and table.iteration[slot] == self.iteration:
+                if table.g[slot] <= new_g:
+                    # Reached as cheaply before in this iteration, and its bound
+                    # is raised above the threshold once that subtree is exhausted
+                    moves.pop()
+                    if new_g + table.h[slot] > threshold:
+                        frame[3] = min(frame[3], new_g + table.h[slot])
                     continue
+            self.store(new_key, state, len(stack), new_g, h)
+            stack.append(
+                [
+                    new_key,
+                    new_g,
+                    board.successors(state),
+                    float("inf"),
+                    state,
+                    stones_h,
+                ]
+            )
 
-                # Check if the neighbor already exists in the open set
+        return False, root[3]
 
-                existing_neighbor = None
-                for open_node in self.open_set:
-                    if self.state_to_tuple(open_node) == neighbor_tuple:
-                        existing_neighbor = open_node
-                        break
+    def ida_star_search(self):
+        # Measure start time and memory
+        start_time = time.time()
+        process = psutil.Process()
+        start_memory = process.memory_info().rss / (1024 * 1024)
 
-                # If the neighbor is not in the open set or has a better f score, update
-                if existing_neighbor is None:
-                    # New neighbor, push it onto the heap
-                    heappush(self.open_set, neighbor)
-                elif neighbor.f < existing_neighbor.f:
-                    # Better path found, update the existing neighbor
-                    self.open_set.remove(existing_neighbor)
-                    heappush(self.open_set, neighbor)
+        initial_state = self.board.initialState()
+        threshold = self.heuristic_function(initial_state)
+        found = self.board.isGoal(initial_state)
+        if found:
+            self.path = ""
+        while not found and threshold != float("inf"):
+            self.iteration += 1
+            found, threshold = self.search(threshold)
 
         # Measure end time and memory
         end_time = time.time()
@@ -516,8 +424,165 @@ class AStar:
         return None
 
 
-def getOutput(weights, maze):
+class AnytimeAStar(AStar):
+    """
+    Anytime repairing A* (ARA*): weighted A* searches with a shrinking weight.
+
+    The first search orders the open set by f = g + epsilon * h with a large
+    epsilon and finds a solution quickly, whose cost is at most epsilon times the
+    optimum. Every later search lowers epsilon and continues from the previous
+    open set instead of starting over: states expanded in the last search are only
+    reopened when a cheaper path to them is found, and those are collected in
+    `incons` until the next search. The last search runs with epsilon = 1 and
+    returns an optimal solution.
+    """
+
+    def __init__(self, epsilon=INITIAL_EPSILON, step=EPSILON_STEP):
+        super().__init__()
+        self.epsilon = epsilon
+        self.step = step
+        self.bound = float("inf")  # Suboptimality bound of the current solution
+        self.closed = set()
+        self.incons = {}
+        self.goal_node = None
+
+    def push(self, node):
+        node.f = node.g + self.epsilon * node.h
+        heappush(self.open_set, node)
+
+    def improve_path(self):
+        """
+        Expand nodes until no open node can lead to a cheaper solution for the
+        current epsilon.
+        """
+        goal_g = self.goal_node.g if self.goal_node else float("inf")
+        while self.open_set and self.open_set[0].f < goal_g:
+            current_node = heappop(self.open_set)
+            current_key = self.state_key(current_node.state)
+            if current_node.g > self.best_g(current_key) or current_key in self.closed:
+                continue
+            self.closed.add(current_key)
+
+            for move, neighbor in self.get_neighbors(current_node):
+                neighbor_key = self.state_key(neighbor.state)
+                if neighbor.g >= self.best_g(neighbor_key):
+                    continue
+                self.add_node(neighbor_key, current_node.id, move, neighbor)
+                if self.board.isGoal(neighbor.state) and neighbor.g < goal_g:
+                    self.goal_node = neighbor
+                    goal_g = neighbor.g
+                if neighbor_key in self.closed:
+                    self.incons[neighbor_key] = neighbor
+                else:
+                    self.push(neighbor)
+
+    def update_bound(self):
+        # Every unexpanded state is a lower bound on the optimal cost
+        lower = min(
+            (
+                node.g + node.h
+                for node in self.open_set + list(self.incons.values())
+                if node.g == self.best_g(self.state_key(node.state))
+            ),
+            default=self.goal_node.g,
+        )
+        self.bound = max(min(self.epsilon, self.goal_node.g / max(lower, 1)), 1.0)
+
+    def ara_star_search(self, callback=None):
+        """
+        Run weighted searches until the solution is proven optimal.
+
+        Parameters:
+            callback (Callable): Called as `callback(result, bound)` with every
+                improved solution, in the format of `get_result`, and its
+                suboptimality bound.
+        """
+        start_time = time.time()
+        process = psutil.Process()
+        start_memory = process.memory_info().rss / (1024 * 1024)
+
+        initial_state = self.board.initialState()
+        stones_h, matching = self.stones_heuristic(self.board.stoneCells(initial_state))
+        start_node = Node(
+            initial_state,
+            0,
+            self.heuristic_function(initial_state, stones_h),
+            -1,
+            stones_h,
+            matching,
+        )
+        self.add_node(self.state_key(initial_state), -1, 0, start_node)
+        if self.board.isGoal(initial_state):
+            self.goal_node = start_node
+        self.push(start_node)
+
+        while True:
+            previous_goal = self.goal_node
+            self.improve_path()
+            if self.goal_node is None:
+                break
+
+            self.update_bound()
+            if self.goal_node is not previous_goal or self.bound == 1:
+                self.reconstruct_path(self.goal_node)
+                self.time = (time.time() - start_time) * 1000
+                self.memory = process.memory_info().rss / (1024 * 1024) - start_memory
+                if callback:
+                    callback(self.get_result(), self.bound)
+            if self.bound == 1 or self.epsilon == 1:
+                break
+
+            # Reuse the search: reopen improved states and re-rank the open set
+            self.epsilon = max(self.epsilon - self.step, 1.0)
+            open_nodes = self.open_set + list(self.incons.values())
+            self.open_set = []
+            self.incons = {}
+            self.closed = set()
+            for node in open_nodes:
+                if node.g == self.best_g(self.state_key(node.state)):
+                    self.push(node)
+
+        self.time = (time.time() - start_time) * 1000
+        self.memory = process.memory_info().rss / (1024 * 1024) - start_memory
+        return None
+
+
+def getOutput(weights, maze, engine=Board, patterns=False):
     astar = AStar()
-    astar.input(weights, maze)
+    astar.input(weights, maze, engine, patterns)
     astar.a_star_search()
     return astar.get_result()
+
+
+def getIDAStarOutput(
+    weights, maze, engine=Board, table_size=TABLE_SIZE, patterns=False
+):
+    """
+    Solve the maze with IDA*, for mazes whose A* open set does not fit in memory,
+    preferably over pushes, see `IDAStar`.
+    """
+    ida_star = IDAStar(table_size)
+    ida_star.input(weights, maze, engine, patterns)
+    ida_star.ida_star_search()
+    return ida_star.get_result()
+
+
+def getAnytimeOutput(
+    weights,
+    maze,
+    engine=Board,
+    epsilon=INITIAL_EPSILON,
+    step=EPSILON_STEP,
+    callback=None,
+    patterns=False,
+):
+    """
+    Solve the maze with anytime A*, see `AnytimeAStar`.
+
+    `callback(result, bound)` receives every improved solution as soon as it is
+    found, the returned result is the last (optimal) one.
+    """
+    ara_star = AnytimeAStar(epsilon, step)
+    ara_star.input(weights, maze, engine, patterns)
+    ara_star.ara_star_search(callback)
+    return ara_star.get_result()
@@ -0,0 +1,133 @@
+INF = float("inf")
+
+
+def minimumCostAssignment(costs):
+    """
+    Solve the assignment problem with the Hungarian algorithm in O(n^2 m).
+
+    Parameters:
+        costs (list[list[float]]): An n x m matrix with n <= m, where `costs[i][j]`
+            is the cost of assigning row i to column j, or `INF` when forbidden.
+
+    Returns:
+        total (float): The minimum total cost of assigning every row to a distinct
+            column, or `INF` when no such assignment exists.
+    """
+    n = len(costs)
+    if n == 0:
+        return 0
+    m = len(costs[0])
+
+    # Potentials and matching use 1-based columns, column 0 is a sentinel
+    rowPotential = [0] * (n + 1)
+    colPotential = [0] * (m + 1)
+    matchedRow = [0] * (m + 1)
+
+    for row in range(1, n + 1):
+        if not _augment(costs, row, rowPotential, colPotential, matchedRow):
+            return INF
+
+    return sum(
+        costs[matchedRow[j] - 1][j - 1] for j in range(1, m + 1) if matchedRow[j]
+    )
+
+
+def solveAssignment(costs, previous=None):
+    """
+    Solve the assignment problem like `minimumCostAssignment`, keeping the
+    matching so that a matrix that differs in a single row can be solved again in
+    O(m^2): only that row is unmatched and augmented again.
+
+    Parameters:
+        costs (list[list[float]]): The cost matrix, see `minimumCostAssignment`.
+        previous (tuple): The matching returned for a matrix of the same size,
+            which is left unmodified. The matrix is solved from scratch in O(m^3)
+            when it is None or differs from `costs` in more than one row.
+
+    Returns:
+        total (float): The minimum total cost, or `INF`.
+        matching (tuple): The matching to pass back with the next matrix, None
+            when the total is `INF`.
+    """
+    n = len(costs)
+    if n == 0:
+        return 0, None
+    m = len(costs[0])
+
+    changed = None
+    if previous is not None:
+        changed = [row for row in range(n) if costs[row] != previous[0][row]]
+        if not changed:
+            return previous[4], previous
+    # Rows of zeros make the matrix square: a column left unmatched would need a
+    # potential of 0 to stay optimal, which an augmentation cannot guarantee
+    # once its row is taken away
+    padded = costs + [[0] * m] * (m - n)
+
+    if changed is None or len(changed) > 1:
+        rowPotential = [0] * (m + 1)
+        colPotential = [0] * (m + 1)
+        matchedRow = [0] * (m + 1)
+        rows = range(1, m + 1)
+    else:
+        rowPotential, colPotential, matchedRow = (list(part) for part in previous[1:4])
+        # Column potentials only ever decrease from 0, so a potential of 0 keeps
+        # the row feasible whatever its new costs
+        rows = (changed[0] + 1,)
+        rowPotential[rows[0]] = 0
+        matchedRow[matchedRow.index(rows[0], 1)] = 0
+
+    for row in rows:
+        if not _augment(padded, row, rowPotential, colPotential, matchedRow):
+            return INF, None
+
+    total = sum(padded[matchedRow[j] - 1][j - 1] for j in range(1, m + 1))
+    return total, (costs, rowPotential, colPotential, matchedRow, total)
+
+
+def _augment(costs, row, rowPotential, colPotential, matchedRow):
+    """
+    Match `row` along a shortest augmenting path, updating the potentials and the
+    matching in place. Returns False when the row cannot reach a free column.
+    """
+    m = len(matchedRow) - 1
+    matchedRow[0] = row
+    col = 0
+    way = [0] * (m + 1)
+    minSlack = [INF] * (m + 1)
+    used = [False] * (m + 1)
+    while True:
+        used[col] = True
+        current = matchedRow[col]
+        delta = INF
+        nextCol = -1
+        currentCosts = costs[current - 1]
+        currentPotential = rowPotential[current]
+        for j in range(1, m + 1):
+            if used[j]:
+                continue
+            slack = currentCosts[j - 1] - currentPotential - colPotential[j]
+            if slack < minSlack[j]:
+                minSlack[j] = slack
+                way[j] = col
+            if minSlack[j] < delta:
+                delta = minSlack[j]
+                nextCol = j
+        if delta == INF:
+            return False
+        for j in range(m + 1):
+            if used[j]:
+                rowPotential[matchedRow[j]] += delta
+                colPotential[j] -= delta
+            else:
+                minSlack[j] -= delta
+        col = nextCol
+        if matchedRow[col] == 0:
+            break
+
+    # Flip the augmenting path
+    while col:
+        previous = way[col]
+        matchedRow[col] = matchedRow[previous]
+        col = previous
+    return True
@@ -1,159 +1,29 @@
 import time
 import psutil
 from collections import deque
-from enum import Enum
+from itertools import islice
 
+from Algorithms.Board import Board
+from Algorithms.NodeStore import NodeStore
+from Algorithms.PushBoard import PushBoard
 
-class Move(Enum):
-    UP = (-1, 0)
-    DOWN = (1, 0)
-    LEFT = (0, -1)
-    RIGHT = (0, 1)
+GOAL_STATE_LIMIT = 20000  # Solved states the backward search may start from
 
 
-class Direction(Enum):
-    UP = "u"
-    DOWN = "d"
-    LEFT = "l"
-    RIGHT = "r"
+def backtrack(board, nodes, goal):
+    moves = nodes.moves(goal)
+    return board.pathString(moves), nodes.cost[goal] - board.moveCount(moves)
 
 
-class Cell(Enum):
-    WALL = "#"
-    EMPTY = " "
-    STONE = "$"
-    PLAYER = "@"
-    SWITCH = "."
-    STONE_SWITCH = "*"
-    PLAYER_SWITCH = "+"
-
-
-moveToDirection = {
-    Move.UP: Direction.UP,
-    Move.DOWN: Direction.DOWN,
-    Move.LEFT: Direction.LEFT,
-    Move.RIGHT: Direction.RIGHT,
-}
-
-
-def getStartPos(grid):
-    """
-    Get the starting position of the grid.
-
-    Parameters:
-        grid (list[list[char]]): A 2D list representing the grid to search.
-
-    Returns:
-        playerStart (tuple[int, int]): A tuple representing the starting position.
-        stonesStart (tuple[tuple[int, int]]): A list of tuples representing the starting positions of the stones.
-        switches (tuple[tuple[int, int]]): A list of tuples representing the positions of the switches.
-    """
-    playerStart = None
-    stonesStart = []
-    switches = []
-    for i in range(len(grid)):
-        for j in range(len(grid[0])):
-            if grid[i][j] in [Cell.PLAYER.value, Cell.PLAYER_SWITCH.value]:
-                playerStart = (i, j)
-            if grid[i][j] in [Cell.STONE.value, Cell.STONE_SWITCH.value]:
-                stonesStart.append((i, j))
-            if grid[i][j] in [
-                Cell.SWITCH.value,
-                Cell.PLAYER_SWITCH.value,
-                Cell.STONE_SWITCH.value,
-            ]:
-                switches.append((i, j))
-    return playerStart, tuple(stonesStart), tuple(switches)
-
-
-def isGoal(stones, switches):
-    """
-    Check if all stones are on the switches.
-
-    Parameters:
-        stones (list[tuple[int, int]]): A list of tuples representing the positions of the stones.
-        switches (list[tuple[int, int]]): A list of tuples representing the positions of the switches.
-
-    Returns:
-        bool: True if the state is a goal state, False otherwise.
-    """
-    return all(stone in switches for stone in stones)
-
-
-def isInGridAndNotWall(grid, pos):
-    """
-    Check if the position is in the grid and not a wall.
-
-    Parameters:
-        grid (list[list[char]]): A 2D list representing the grid to search.
-        pos (tuple[int, int]): A tuple representing the position to check.
-
-    Returns:
-        bool: True if the position is in the grid and not a wall, False otherwise.
-    """
-    return (
-        0 <= pos[0] < len(grid)
-        and 0 <= pos[1] < len(grid[0])
-        and grid[pos[0]][pos[1]] != Cell.WALL.value
-    )
-
-
-def transition(weights, grid, state, move):
-    """
-    Perform a transition on the given state.
-
-    Parameters:
-        weights (list[int]): A list of stone weights.
-        grid (list[list[char]]): A 2D list representing the grid to search.
-        state (tuple[tuple[int, int]]): A tuple representing the current state.
-        move (Move): A Move enum representing the move to make.
-
-    Returns:
-        newState (tuple[tuple[int, int]]): A tuple representing the new state.
-        cost (int): The cost of the move.
-    """
-    player = state[0]
-    stones = state[1]
-
-    newPlayer = (player[0] + move.value[0], player[1] + move.value[1])
-    if not isInGridAndNotWall(grid, newPlayer):
-        return None
-
-    cost = None
-    newStones = []
-    for index, stone in enumerate(stones):
-        newStone = stone
-        if stone == newPlayer:
-            cost = weights[index]
-            newStone = (stone[0] + move.value[0], stone[1] + move.value[1])
-            if not (isInGridAndNotWall(grid, newStone) and newStone not in stones):
-                return None
-        newStones.append(newStone)
-
-    return (newPlayer, tuple(newStones)), cost
-
-
-def backtrack(previousStateMap, goal):
-    path = ""
-    weight = 0
-    while previousStateMap[goal] != -1:
-        prev, move, cost = previousStateMap[goal]
-        char = moveToDirection[move].value
-        if cost is not None:
-            char = char.upper()
-            weight += cost
-        path = char + path
-        goal = prev
-    return path, weight
-
-
-def getOutput(weights, grid):
+def getOutput(weights, grid, engine=Board):
     """
     Perform Breadth-First Search (BFS) on the given grid.
 
     Parameters:
         weights (list[int]): A list of integer weights.
         grid (list[list[char]]): A 2D list representing the grid to search.
+        engine (type): The move generator to search with: `Board`, `Bitboard`,
+            `ZobristBoard`, or `PushBoard` to search over pushes only.
 
     Returns:
         path (str): A string representing the path from the start to the goal.
@@ -163,13 +33,19 @@ def getOutput(weights, grid):
         time (int): The time taken to run the algorithm in milliseconds.
         memory (int): The memory used by the algorithm in megabytes.
     """
-    playerStart, stonesStart, switches = getStartPos(grid)
+    board = engine(weights, grid)
 
-    initialState = (playerStart, stonesStart)
+    initialKey = board.key(board.initialState())
 
-    queue = deque([initialState])
-    previousStateMap = {}
-    previousStateMap[initialState] = -1
+    # The queue holds state keys (see Board.key), the map gives the id of the node
+    # that reached each key in the node store. Keys that are hashes keep their
+    # state in the node store, since they cannot be unpacked, to check them (see
+    # Board.checkedKey)
+    exact = board.exactKeys
+    nodes = NodeStore(board.moveType, not exact)
+    queue = deque([initialKey])
+    nodeIds = {}
+    nodeIds[initialKey] = nodes.add(-1, 0, 0, None if exact else board.initialState())
 
     # tracemalloc.start()
     start_time = time.time()
@@ -180,30 +56,39 @@ def getOutput(weights, grid):
     ans = None
 
     while queue:
-        current = queue.popleft()
+        currentKey = queue.popleft()
+        currentId = nodeIds[currentKey]
+        current = board.unpack(currentKey) if exact else nodes.states[currentId]
 
-        if isGoal(current[1], switches):
-            path, weight = backtrack(previousStateMap, current)
+        if board.isGoal(current):
+            path, weight = backtrack(board, nodes, currentId)
             ans = {
                 "path": path,
                 "steps": len(path),
                 "weight": weight,
-                "node": len(previousStateMap),
+                "node": len(nodeIds),
                 "time": (time.time() - start_time) * 1000,
                 "memory": max((process.memory_info().rss - start_memory) / 2**20, 0.0),
                 # "memory": (tracemalloc.get_traced_memory()[1] - start_memory) / 2**20,
             }
-            # ans = (path, len(path), weight, len(previousStateMap), (time.time() - start_time) * 1000, (tracemalloc.get_traced_memory()[1]-start_memory) / 2**20)
+            # ans = (path, len(path), weight, len(nodeIds), (time.time() - start_time) * 1000, (tracemalloc.get_traced_memory()[1]-start_memory) / 2**20)
             break
 
-        for move in Move:
-            result = transition(weights, grid, current, move)
-            if result is None:
-                continue
-            newState, cost = result
-            if newState not in previousStateMap:
-                queue.append(newState)
-                previousStateMap[newState] = (current, move, cost)
+        currentCost = nodes.cost[currentId]
+        for move, cost, newState in board.successors(current):
+            newKey = board.key(newState)
+            if not exact and newKey in nodeIds:
+                newKey = board.checkedKey(
+                    newKey, newState, nodes.states[nodeIds[newKey]]
+                )
+            if newKey not in nodeIds:
+                queue.append(newKey)
+                nodeIds[newKey] = nodes.add(
+                    currentId,
+                    move,
+                    currentCost + cost,
+                    None if exact else newState,
+                )
 
     if ans is None:
         return None
@@ -216,3 +101,126 @@ def getOutput(weights, grid):
         ans["memory"],
         ans["path"],
     )
+
+
+def expandLayer(board, expand, layer, nodes, nodeIds, otherIds):
+    """
+    Expand one BFS layer of either side of `getBidirectionalOutput`.
+
+    Parameters:
+        board (PushBoard): The board being solved.
+        expand (Callable): `board.successors` or `board.predecessors`.
+        layer (list[int]): The keys of the layer to expand.
+        nodes (NodeStore): The node store of this side.
+        nodeIds (dict[int, int]): The node id of every key seen by this side.
+        otherIds (dict[int, int]): The node id of every key seen by the other side.
+
+    Returns:
+        nextLayer (list[int]): The keys of the next layer.
+        meeting (int): The first new key the other side has seen, or None.
+    """
+    nextLayer = []
+    for currentKey in layer:
+        currentId = nodeIds[currentKey]
+        currentCost = nodes.cost[currentId]
+        for move, cost, newState in expand(board.unpack(currentKey)):
+            newKey = board.key(newState)
+            if newKey not in nodeIds:
+                nextLayer.append(newKey)
+                nodeIds[newKey] = nodes.add(currentId, move, currentCost + cost)
+                if newKey in otherIds:
+                    return nextLayer, newKey
+    return nextLayer, None
+
+
+def getBidirectionalOutput(weights, grid):
+    """
+    Perform a bidirectional BFS over pushes on the given grid.
+
+    A forward search pushes stones from the initial state while a backward search
+    pulls them from every solved state (see `PushBoard.goalStates`), one layer at a
+    time on whichever side has the smaller frontier. Both sides share
+    `PushBoard.key`, which ignores where the player is within its region and the
+    order of stones of the same weight, and stop as soon as one reaches a key the
+    other has seen: the path is the pushes up to that
+    state followed by the pushes the backward search made to reach it, reversed.
+
+    The solved states are every assignment of stones to switches that differ in
+    weight, times the player regions around them, which grows with the factorial
+    of the number of stones of distinct weights. When there are more than
+    `GOAL_STATE_LIMIT` of them, the search falls back to a forward BFS over pushes
+    (`getOutput` with `PushBoard`). Either way, the time grows with the number of
+    push states: input-10 takes about 25 seconds, and input-07 is out of reach.
+
+    Parameters:
+        weights (list[int]): A list of integer weights.
+        grid (list[list[char]]): A 2D list representing the grid to search.
+
+    Returns:
+        path (str): A string representing the path from the start to the goal.
+        steps (int): The number of steps taken to reach the goal.
+        weight (int): The total weight Ares has to push.
+        node (int): The number of nodes generated by both searches.
+        time (int): The time taken to run the algorithm in milliseconds.
+        memory (int): The memory used by the algorithm in megabytes.
+    """
+    board = PushBoard(weights, grid)
+
+    start_time = time.time()
+    process = psutil.Process()
+    start_memory = process.memory_info().rss
+
+    forward = NodeStore(board.moveType)
+    forwardIds = {}
+    initialKey = board.key(board.initialState())
+    forwardIds[initialKey] = forward.add(-1, 0, 0)
+    forwardLayer = [initialKey]
+
+    goalStates = list(islice(board.goalStates(), GOAL_STATE_LIMIT + 1))
+    if len(goalStates) > GOAL_STATE_LIMIT:
+        return getOutput(weights, grid, PushBoard)
+
+    backward = NodeStore(board.moveType)
+    backwardIds = {}
+    backwardLayer = []
+    for state in goalStates:
+        key = board.key(state)
+        if key not in backwardIds:
+            backwardIds[key] = backward.add(-1, 0, 0)
+            backwardLayer.append(key)
+
+    meeting = initialKey if initialKey in backwardIds else None
+    while meeting is None and forwardLayer and backwardLayer:
+        if len(forwardLayer) <= len(backwardLayer):
+            forwardLayer, meeting = expandLayer(
+                board, board.successors, forwardLayer, forward, forwardIds, backwardIds
+            )
+        else:
+            backwardLayer, meeting = expandLayer(
+                board,
+                board.predecessors,
+                backwardLayer,
+                backward,
+                backwardIds,
+                forwardIds,
+            )
+
+    if meeting is None:
+        return None
+
+    forwardId = forwardIds[meeting]
+    backwardId = backwardIds[meeting]
+    moves = list(forward.moves(forwardId)) + list(backward.moves(backwardId))[::-1]
+    path = board.pathString(moves)
+    weight = (
+        forward.cost[forwardId] + backward.cost[backwardId] - board.moveCount(moves)
+    )
+
+    return (
+        len(path),
+        weight,
+        len(forwardIds) + len(backwardIds),
+        (time.time() - start_time) * 1000,
+        max((process.memory_info().rss - start_memory) / 2**20, 0.0),
+        path,
+    )
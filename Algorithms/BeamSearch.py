@@ -0,0 +1,228 @@
+import time
+import psutil
+from collections import deque
+from heapq import heappush, heapreplace
+
+from Algorithms.Assignment import INF, solveAssignment
+from Algorithms.NodeStore import NodeStore
+from Algorithms.PushBoard import PushBoard
+
+BEAM_WIDTH = 1000  # States kept in every layer by default
+VISITED_LAYERS = 8  # Layers whose state keys are remembered, to skip them
+MAX_LAYERS = 2000  # Layers searched before giving up
+
+
+def assignmentHeuristic(board):
+    """
+    Estimate a state by the cheapest assignment of stones to distinct switches,
+    only re-assigning the pushed stone from the matching of the parent.
+    """
+    costs = board.pushCosts()
+
+    def heuristic(state, parentMatching=None):
+        stones = board.stoneCells(state)
+        return solveAssignment(
+            [costs[stone][index] for index, stone in enumerate(stones)],
+            parentMatching,
+        )
+
+    return heuristic
+
+
+def nearestSwitchHeuristic(board):
+    """
+    Estimate a state by pushing every stone onto its nearest switch, which is
+    cheaper to compute than `assignmentHeuristic` on mazes with many stones.
+    """
+    costs = board.pushCosts()
+
+    def heuristic(state, parentMatching=None):
+        stones = board.stoneCells(state)
+        return (
+            sum(min(costs[stone][index]) for index, stone in enumerate(stones)),
+            None,
+        )
+
+    return heuristic
+
+
+def bestCandidates(candidates, width, estimate=None):
+    """
+    Select the `width` candidates with the lowest (h, path cost).
+
+    Parameters:
+        candidates (list[tuple]): Tuples `(h, path cost, ..., state, matching)`,
+            where `h` is only a lower bound of the estimate when `estimate` is
+            given, and `matching` is then the one of the parent state.
+        width (int): The number of candidates to keep.
+        estimate (Callable): The heuristic to compute for a candidate. It is only
+            called in the order of the lower bounds, until no candidate left can
+            beat the ones kept.
+
+    Returns:
+        best (list[tuple]): The candidates kept, with their estimate as `h` and
+            their own matching.
+    """
+    candidates.sort(key=lambda candidate: candidate[:2])
+    # The worst candidate kept is on top: entries are (-h, -path cost, -index)
+    kept = []
+    for index, candidate in enumerate(candidates):
+        h, cost = candidate[:2]
+        if len(kept) == width and (h, cost) >= (-kept[0][0], -kept[0][1]):
+            break
+        if estimate is not None:
+            h, matching = estimate(*candidate[-2:])
+            if h == INF:
+                continue
+            candidate = (h,) + candidate[1:-1] + (matching,)
+        if len(kept) < width:
+            heappush(kept, (-h, -cost, -index, candidate))
+        elif (h, cost) < (-kept[0][0], -kept[0][1]):
+            heapreplace(kept, (-h, -cost, -index, candidate))
+    return [entry[-1] for entry in sorted(kept, reverse=True)]
+
+
+def checkedKey(board, visited, key, state):
+    """
+    `Board.checkedKey` against every layer of `visited` that holds `key`, since
+    they may hold different states under it.
+
+    A state that collided is only kept under its packed key while the state that
+    took the hash is remembered, so it may be generated again after that, like
+    any state older than the remembered layers, but no other state is skipped.
+    """
+    checked = key
+    for keys in visited:
+        if key in keys:
+            checked = board.checkedKey(key, state, keys[key])
+            if checked == key:
+                break
+    return checked
+
+
+def getOutput(
+    weights,
+    grid,
+    engine=PushBoard,
+    width=BEAM_WIDTH,
+    heuristic=assignmentHeuristic,
+    bound=nearestSwitchHeuristic,
+):
+    """
+    Perform a beam search on the given grid.
+
+    The search goes breadth-first, but only keeps the `width` states of every
+    layer with the lowest heuristic value (ties broken by path cost). States are
+    skipped when they were generated in one of the last `VISITED_LAYERS` layers,
+    so the keys remembered stay bounded, and only the node store grows with the
+    solution length, by `width` entries per layer. Since older states may come
+    back, the search gives up after `MAX_LAYERS` layers. The solution is neither
+    optimal nor guaranteed to be found.
+
+    Every new state needs a flood fill of the player's region (see
+    `PushBoard.key`), which dominates on large mazes: input-07 takes about 6
+    seconds with a width of 100, and more than a minute with the default.
+
+    The candidates are ranked by `bound` first, and `heuristic` is only computed
+    for those whose bound still beats the worst state kept so far.
+
+    Parameters:
+        weights (list[int]): A list of integer weights.
+        grid (list[list[char]]): A 2D list representing the grid to search.
+        engine (type): The move generator to search with, see `BFS.getOutput`.
+        width (int): The number of states kept in every layer.
+        heuristic (Callable): Called with the board, returns the function that
+            estimates the cost to the goal of a state, infinite for a dead end.
+            It is called as `estimate(state, parentMatching)` and returns the
+            estimate and a matching passed on to the children, see
+            `assignmentHeuristic`.
+        bound (Callable): Like `heuristic`, for an estimate that is cheaper to
+            compute and never above it. None to compute `heuristic` for every
+            candidate.
+
+    Returns:
+        path (str): A string representing the path from the start to the goal.
+        steps (int): The number of steps taken to reach the goal.
+        weight (int): The total weight Ares has to push.
+        node (int): The number of nodes generated by the algorithm.
+        time (int): The time taken to run the algorithm in milliseconds.
+        memory (int): The memory used by the algorithm in megabytes.
+    """
+    board = engine(weights, grid)
+    estimate = heuristic(board)
+    lowerBound = estimate if bound is None else bound(board)
+
+    start_time = time.time()
+    process = psutil.Process()
+    start_memory = process.memory_info().rss
+
+    nodes = NodeStore(board.moveType)
+    initialState = board.initialState()
+    # The keys generated in each of the last layers, the current one last, each
+    # with its state when keys are hashes (see Board.checkedKey)
+    exact = board.exactKeys
+    visited = deque(
+        [{board.key(initialState): None if exact else initialState}],
+        maxlen=VISITED_LAYERS,
+    )
+    # Every beam entry is (node id, state, matching of the heuristic)
+    beam = [(nodes.add(-1, 0, 0), initialState, None)]
+    generated = 1
+    goal = 0 if board.isGoal(initialState) else None
+
+    layers = 0
+    while beam and goal is None and layers < MAX_LAYERS:
+        layers += 1
+        seen = {}
+        visited.append(seen)
+        # Candidates are (lower bound of h, path cost, parent id, move, state,
+        # matching), the matching being the parent's until h is computed
+        candidates = []
+        for nodeId, state, matching in beam:
+            currentCost = nodes.cost[nodeId]
+            for move, cost, newState in board.successors(state):
+                newKey = board.key(newState)
+                if not exact:
+                    newKey = checkedKey(board, visited, newKey, newState)
+                if any(newKey in keys for keys in visited):
+                    continue
+                seen[newKey] = None if exact else newState
+                generated += 1
+                if board.isGoal(newState):
+                    goal = nodes.add(nodeId, move, currentCost + cost)
+                    break
+                h, newMatching = lowerBound(newState, matching)
+                if h != INF:
+                    candidates.append(
+                        (
+                            h,
+                            currentCost + cost,
+                            nodeId,
+                            move,
+                            newState,
+                            matching if bound is not None else newMatching,
+                        )
+                    )
+            if goal is not None:
+                break
+
+        beam = [
+            (nodes.add(parent, move, cost), state, matching)
+            for _, cost, parent, move, state, matching in bestCandidates(
+                candidates, width, None if bound is None else estimate
+            )
+        ]
+
+    if goal is None:
+        return None
+
+    moves = nodes.moves(goal)
+    path = board.pathString(moves)
+    return (
+        len(path),
+        nodes.cost[goal] - board.moveCount(moves),
+        generated,
+        (time.time() - start_time) * 1000,
+        max((process.memory_info().rss - start_memory) / 2**20, 0.0),
+        path,
+    )
@@ -0,0 +1,146 @@
+from Algorithms.Board import Board, PUSH
+
+
+class Bitboard(Board):
+    """
+    A board whose stones, walls and switches are Python integer bitmasks.
+
+    Bit `i` of a mask stands for cell `i` of the underlying `Board`. A state is a
+    tuple `(player, stones, masks)` where `masks` holds one stone mask per distinct
+    stone weight (in the order of `classWeights`), so stones of equal weight share a
+    mask, and `stones` is the union of all masks. It exposes the same interface as
+    `Board` and can be passed to any solver that accepts an `engine`.
+
+    Attributes:
+        wallMask (int): Bits set on wall cells.
+        switchMask (int): Bits set on switch cells.
+        deadMask (int): Bits set on dead cells, see `Board.dead`.
+        openMasks (tuple[int]): For every direction, bits set on the cells whose
+            neighbor in that direction is inside the grid and not a wall.
+        offsets (tuple[int]): The index offset of each direction.
+        classWeights (tuple[int]): The weight of the stones in each mask.
+        classIndices (tuple[tuple[int]]): The indices (in `weights`) of the
+            stones in each mask.
+    """
+
+    def __init__(self, weights, grid):
+        super().__init__(weights, grid)
+        self.offsets = (-self.width, self.width, -1, 1)
+        self.wallMask = self.toMask(i for i in range(self.size) if self.wall[i])
+        self.switchMask = self.toMask(self.switches)
+        self.deadMask = self.toMask(i for i in range(self.size) if self.dead[i])
+        self.openMasks = tuple(
+            self.toMask(
+                cell
+                for cell in range(self.size)
+                if self.neighbors[cell][direction] >= 0
+            )
+            for direction in range(4)
+        )
+        self.classWeights = tuple(sorted(set(self.weights)))
+        # The stone indices of the stones in each mask
+        self.classIndices = tuple(
+            tuple(
+                index
+                for index, weight in enumerate(self.weights[: len(self.stones)])
+                if weight == classWeight
+            )
+            for classWeight in self.classWeights
+        )
+        self.startMasks = tuple(
+            self.toMask(
+                stone
+                for stone, weight in zip(self.stones, self.weights)
+                if weight == classWeight
+            )
+            for classWeight in self.classWeights
+        )
+
+    @staticmethod
+    def toMask(cells):
+        mask = 0
+        for cell in cells:
+            mask |= 1 << cell
+        return mask
+
+    @staticmethod
+    def toCells(mask):
+        cells = []
+        while mask:
+            low = mask & -mask
+            cells.append(low.bit_length() - 1)
+            mask ^= low
+        return cells
+
+    def stoneCells(self, state):
+        """
+        Unpack the stone masks into cells, see `Board.stoneCells`. Stones of the
+        same weight are interchangeable, so they take their cells in any order.
+        """
+        cells = [0] * len(self.stones)
+        for indices, mask in zip(self.classIndices, state[2]):
+            for index, cell in zip(indices, self.toCells(mask)):
+                cells[index] = cell
+        return tuple(cells)
+
+    def initialState(self):
+        return self.player, self.toMask(self.stones), self.startMasks
+
+    def isGoal(self, state):
+        return state[1] & ~self.switchMask == 0
+
+    def key(self, state):
+        """
+        Pack a state into a single int: the player cell in the lowest `cellBits`
+        bits, followed by one `size`-bit block per stone mask.
+        """
+        player, stones, masks = state
+        key = player
+        shift = self.cellBits
+        for mask in masks:
+            key |= mask << shift
+            shift += self.size
+        return key
+
+    def unpack(self, key):
+        player = key & ((1 << self.cellBits) - 1)
+        key >>= self.cellBits
+        cellMask = (1 << self.size) - 1
+        stones = 0
+        masks = []
+        for _ in self.classWeights:
+            masks.append(key & cellMask)
+            stones |= key & cellMask
+            key >>= self.size
+        return player, stones, tuple(masks)
+
+    def successors(self, state):
+        player, stones, masks = state
+        blocked = stones | self.deadMask
+        playerBit = 1 << player
+        for direction, (offset, openMask) in enumerate(
+            zip(self.offsets, self.openMasks)
+        ):
+            if not playerBit & openMask:
+                continue
+            nextCell = player + offset
+            nextBit = 1 << nextCell
+            if not nextBit & stones:
+                yield direction, 1, (nextCell, stones, masks)
+                continue
+
+            targetBit = 1 << (nextCell + offset)
+            if not nextBit & openMask or targetBit & blocked:
+                continue
+            moved = nextBit | targetBit
+            if self.isDeadlock(self.toCells(stones ^ moved), nextCell + offset):
+                continue
+            index = 0
+            while not masks[index] & nextBit:
+                index += 1
+            newMasks = masks[:index] + (masks[index] ^ moved,) + masks[index + 1 :]
+            yield (
+                direction | PUSH,
+                1 + self.classWeights[index],
+                (nextCell, stones ^ moved, newMasks),
+            )
@@ -0,0 +1,362 @@
+import hashlib
+from enum import Enum
+
+from Algorithms.DeadlockTable import DeadlockTable
+from Algorithms.MazeCache import compiledMaze
+
+
+class Cell(Enum):
+    WALL = "#"
+    EMPTY = " "
+    STONE = "$"
+    PLAYER = "@"
+    SWITCH = "."
+    STONE_SWITCH = "*"
+    PLAYER_SWITCH = "+"
+
+
+# Directions are indexed 0..3 in this order everywhere in the board.
+# A move code is the direction index, plus 4 when the move pushes a stone.
+MOVE_CHARS = "udlrUDLR"
+PUSH = 4
+
+
+class Board:
+    """
+    A maze compiled once into flat cell indices.
+
+    Cell `i` is the square at row `i // width`, column `i % width`. A state is a
+    tuple `(player, stones)` where `player` is a cell index and `stones` is a
+    tuple of cell indices in the same order as `weights`. Visited sets are keyed
+    by `key(state)`, which packs a state into a single int of `cellBits` bits per
+    cell index, ignoring the order of stones of the same weight.
+
+    Attributes:
+        pushLevel (bool): Whether a move is a whole push, see `PushBoard`.
+        learnDeadlocks (bool): Whether pushes are also checked against a
+            `DeadlockTable`, kept in `deadlocks`. Off by default, since the
+            checks cost more time than they save on small mazes, see
+            `LearningBoard`.
+        cacheOnDisk (bool): Whether the static analysis of the maze is also
+            cached on disk, see `MazeCache.compiledMaze`.
+        exactKeys (bool): Whether different states always get different keys.
+            When they do not, see `checkedKey`.
+        moveType (str): The `array` typecode that holds a move code.
+        width (int): Number of columns of the grid.
+        height (int): Number of rows of the grid.
+        size (int): Number of cells, `width * height`.
+        cellBits (int): Number of bits needed to store a cell index.
+        wall (bytearray): 1 for every wall (or padding) cell, 0 otherwise.
+        switch (bytearray): 1 for every switch cell, 0 otherwise.
+        neighbors (list[tuple[int]]): For every cell, the cell reached in each
+            direction, or -1 when it is a wall or outside of the grid.
+        pushTargets (list[tuple[int]]): For every cell, the cell two steps away in
+            each direction (where a pushed stone lands), or -1 when either step is
+            blocked by a wall.
+        dead (bytearray): 1 for every floor cell from which a stone can never be
+            pushed onto any switch, 0 otherwise. Pushes onto dead cells are never
+            generated.
+        pushDistances (list[list[int]]): For every switch, the pushes a lone stone
+            needs to reach it from each cell, -1 when it cannot.
+        walkDistances (list[list[int]]): For every pair of cells, the steps the
+            player needs from the first to the second ignoring stones, -1 when it
+            cannot.
+        player (int): The starting cell of the player.
+        stones (tuple[int]): The starting cells of the stones.
+        weights (tuple[int]): The weight of each stone.
+        switches (tuple[int]): The cells of the switches.
+        weightClasses (list[tuple[int]]): The stone indices of every weight.
+        maxMoveCost (int): An upper bound on the cost of a single move.
+
+    Everything from `neighbors` to `walkDistances` only depends on the walls and
+    the switches, and is shared by the boards of the same layout (see
+    `MazeCache`), so it must not be modified.
+    """
+
+    pushLevel = False
+    moveType = "B"
+    learnDeadlocks = False
+    cacheOnDisk = False
+    exactKeys = True
+
+    def __init__(self, weights, grid):
+        self.height = len(grid)
+        self.width = max(len(row) for row in grid)
+        self.size = self.height * self.width
+        self.cellBits = max(self.size - 1, 1).bit_length()
+        self.wall = bytearray(self.size)
+        self.switch = bytearray(self.size)
+        self.player = None
+        self.weights = tuple(weights)
+
+        stones = []
+        switches = []
+        for i, row in enumerate(grid):
+            for j in range(self.width):
+                cell = i * self.width + j
+                char = row[j] if j < len(row) else Cell.WALL.value
+                if char == Cell.WALL.value:
+                    self.wall[cell] = 1
+                if char in [Cell.PLAYER.value, Cell.PLAYER_SWITCH.value]:
+                    self.player = cell
+                if char in [Cell.STONE.value, Cell.STONE_SWITCH.value]:
+                    stones.append(cell)
+                if char in [
+                    Cell.SWITCH.value,
+                    Cell.PLAYER_SWITCH.value,
+                    Cell.STONE_SWITCH.value,
+                ]:
+                    self.switch[cell] = 1
+                    switches.append(cell)
+        self.stones = tuple(stones)
+        self.switches = tuple(switches)
+        # The indices of the stones of each weight, which are interchangeable
+        classes = {}
+        for index, weight in enumerate(self.weights[: len(stones)]):
+            classes.setdefault(weight, []).append(index)
+        self.weightClasses = [tuple(indices) for indices in classes.values()]
+        self.maxMoveCost = 1 + max(self.weights, default=0)
+
+        # The static analysis is shared by every board of the same layout
+        compiled = compiledMaze(self, self.cacheOnDisk)
+        self.neighbors = compiled.neighbors
+        self.pushTargets = compiled.pushTargets
+        self.pushDistances = compiled.pushDistances
+        self.walkDistances = compiled.walkDistances
+        self.dead = compiled.dead
+        self.deadlocks = DeadlockTable(self) if self.learnDeadlocks else None
+
+    def pushCosts(self):
+        """
+        The cost of pushing each stone from each cell onto each switch, ignoring
+        the other stones: `costs[cell][stone][switch]` is the pushes times
+        `1 + weights[stone]`, infinite when it cannot.
+        """
+        inf = float("inf")
+        return [
+            [
+                [
+                    inf if distances[cell] < 0 else distances[cell] * (1 + weight)
+                    for distances in self.pushDistances
+                ]
+                for weight in self.weights
+            ]
+            for cell in range(self.size)
+        ]
+
+    def layoutKey(self):
+        """
+        A hash of the walls and switches, which is all the static analysis of
+        the maze depends on.
+        """
+        digest = hashlib.sha1(f"{self.width}x{self.height}".encode())
+        digest.update(bytes(self.wall))
+        digest.update(bytes(self.switch))
+        return digest.hexdigest()
+
+    def isDeadlock(self, stones, stone):
+        """
+        Check a freshly pushed stone for a freeze deadlock, then against the
+        learned deadlock patterns if enabled.
+        """
+        if self.isFreezeDeadlock(stones, stone):
+            return True
+        return self.deadlocks is not None and self.deadlocks.isDeadlock(stones, stone)
+
+    def isFreezeDeadlock(self, stones, stone):
+        """
+        Check whether a freshly pushed stone ends up frozen off a switch.
+
+        A stone is frozen when it is blocked on both axes. An axis is blocked by a
+        wall on either side, by dead cells on both sides, or by a neighboring stone
+        that is frozen itself (checked recursively, with the stones on the way
+        treated as walls). The position is dead when any of the frozen stones
+        found is not on a switch.
+
+        Parameters:
+            stones (Container[int]): The cells of all stones after the push.
+            stone (int): The cell of the pushed stone.
+
+        Returns:
+            bool: True if the position can never be solved.
+        """
+        frozen = []
+        if not self._isFrozen(stones, stone, set(), frozen):
+            return False
+        for cell in frozen:
+            if not self.switch[cell]:
+                return True
+        return False
+
+    def _isFrozen(self, stones, stone, checked, frozen):
+        # The stone counts as a wall while its neighbors are being checked
+        checked.add(stone)
+        found = len(frozen)
+        up, down, left, right = self.neighbors[stone]
+        isFrozen = self._isAxisBlocked(
+            stones, left, right, checked, frozen
+        ) and self._isAxisBlocked(stones, up, down, checked, frozen)
+        if isFrozen:
+            frozen.append(stone)
+        else:
+            # The neighbors found frozen leaned on this stone being a wall
+            for cell in frozen[found:]:
+                checked.discard(cell)
+            del frozen[found:]
+            checked.discard(stone)
+        return isFrozen
+
+    def _isAxisBlocked(self, stones, first, second, checked, frozen):
+        if first < 0 or second < 0:
+            return True
+        if self.dead[first] and self.dead[second]:
+            return True
+        for cell in (first, second):
+            if cell in checked:
+                return True
+            if cell in stones and self._isFrozen(stones, cell, checked, frozen):
+                return True
+        return False
+
+    def position(self, cell):
+        """
+        Convert a cell index back to a `(row, col)` tuple.
+        """
+        return divmod(cell, self.width)
+
+    def canonical(self, stones):
+        """
+        Sort the cells within every weight class, so that states that only swap
+        stones of the same weight get the same stones tuple.
+        """
+        if len(self.weightClasses) == len(stones):
+            return stones
+        canonical = list(stones)
+        for indices in self.weightClasses:
+            cells = sorted(stones[index] for index in indices)
+            for index, cell in zip(indices, cells):
+                canonical[index] = cell
+        return tuple(canonical)
+
+    def initialState(self):
+        return self.player, self.stones
+
+    def stoneCells(self, state):
+        """
+        The cells of the stones of a state, in the order of `weights`.
+        """
+        return state[1]
+
+    def isGoal(self, state):
+        switch = self.switch
+        for stone in state[1]:
+            if not switch[stone]:
+                return False
+        return True
+
+    def key(self, state):
+        """
+        Pack a state into a single int: the player cell in the lowest `cellBits`
+        bits, followed by the cell of every stone in order.
+
+        Stones of the same weight are interchangeable, so the stones are packed in
+        `canonical` order and states that only swap them share a key.
+        """
+        player, stones = state
+        bits = self.cellBits
+        key = player
+        shift = bits
+        for stone in self.canonical(stones):
+            key |= stone << shift
+            shift += bits
+        return key
+
+    def packedKey(self, state):
+        """
+        The key of a state that no other state shares and `unpack` inverts: `key`
+        itself unless `exactKeys` is False.
+        """
+        return self.key(state)
+
+    def sameState(self, state, other):
+        """
+        Whether two states get the same `packedKey`.
+        """
+        return self.packedKey(state) == self.packedKey(other)
+
+    def checkedKey(self, key, state, storedState):
+        """
+        Check the `key` of a state found among the keys of a search, for boards
+        whose keys are hashes (see `exactKeys`).
+
+        Parameters:
+            key (int): The key of `state`.
+            state (tuple): The state being looked up.
+            storedState (tuple): The state stored along with the entry of `key`.
+
+        Returns:
+            key (int): `key` when the entry is for the same state, otherwise the
+                negated packed key of `state`, which no hash can equal.
+        """
+        if self.sameState(state, storedState):
+            return key
+        return -1 - self.packedKey(state)
+
+    def unpack(self, key):
+        """
+        Inverse of `key`.
+        """
+        bits = self.cellBits
+        mask = (1 << bits) - 1
+        player = key & mask
+        stones = []
+        for _ in range(len(self.stones)):
+            key >>= bits
+            stones.append(key & mask)
+        return player, tuple(stones)
+
+    def successors(self, state):
+        """
+        Generate every legal move from the given state.
+
+        Parameters:
+            state (tuple[int, tuple[int]]): The state to expand.
+
+        Yields:
+            move (int): The move code, see `MOVE_CHARS`.
+            cost (int): 1 for a step, 1 plus the stone weight for a push.
+            newState (tuple[int, tuple[int]]): The state after the move.
+
+        Pushes onto dead cells and pushes into a deadlock (see `isDeadlock`) are
+        left out.
+        """
+        player, stones = state
+        pushTargets = self.pushTargets[player]
+        for direction, nextCell in enumerate(self.neighbors[player]):
+            if nextCell < 0:
+                continue
+            if nextCell not in stones:
+                yield direction, 1, (nextCell, stones)
+                continue
+
+            target = pushTargets[direction]
+            if target < 0 or self.dead[target] or target in stones:
+                continue
+            index = stones.index(nextCell)
+            newStones = stones[:index] + (target,) + stones[index + 1 :]
+            if self.isDeadlock(newStones, target):
+                continue
+            yield direction | PUSH, 1 + self.weights[index], (nextCell, newStones)
+
+    def moveCount(self, moves):
+        """
+        The number of steps and pushes the move codes stand for. Each of them
+        costs 1 on top of the pushed weight.
+        """
+        return len(moves)
+
+    def pathString(self, moves):
+        """
+        Convert a sequence of move codes to the `uUdD...` string the Visualizer replays.
+        """
+        return "".join(MOVE_CHARS[move] for move in moves)
@@ -0,0 +1,33 @@
+class BucketQueue:
+    """
+    Dial's monotone priority queue for small non-negative integer costs.
+
+    Items live in a circular array of `maxStep + 1` buckets indexed by cost, so
+    pushes and pops are O(1). Pops never go back in cost, and every push must
+    have a cost between the last popped cost and that cost plus `maxStep`, which
+    holds for uniform-cost search when no move costs more than `maxStep`.
+    """
+
+    def __init__(self, maxStep):
+        self.buckets = [[] for _ in range(maxStep + 1)]
+        self.cost = 0  # Cost of the bucket the next pop starts from
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, cost, item):
+        self.buckets[cost % len(self.buckets)].append(item)
+        self.size += 1
+
+    def pop(self):
+        """
+        Remove and return `(cost, item)` for an item of the lowest cost.
+        """
+        buckets = self.buckets
+        bucket = buckets[self.cost % len(buckets)]
+        while not bucket:
+            self.cost += 1
+            bucket = buckets[self.cost % len(buckets)]
+        self.size -= 1
+        return self.cost, bucket.pop()
@@ -1,20 +1,21 @@
 import time
 import psutil
+from array import array
+
+from Algorithms.Board import Board
 
-DIRECTIONS = {"u": (-1, 0), "d": (1, 0), "l": (0, -1), "r": (0, 1)}
-PUSH_DIRECTIONS = {"U": (-1, 0), "D": (1, 0), "L": (0, -1), "R": (0, 1)}
 DEPTH_THRESHOLD = 1000
 
 
-def getOutput(weights, maze):
-    game = Sokoban(maze, weights)
+def getOutput(weights, maze, engine=Board, iterativeDeepening=False):
+    game = Sokoban(maze, weights, engine)
 
-    foundResult, elapsedTime, totalMemory = game.solve()
+    foundResult, elapsedTime, totalMemory = game.solve(iterativeDeepening)
 
     if foundResult:
         return (
             game.result["steps"],
-            game.result["weight"] - game.result["steps"],
+            game.result["weight"],
             game.result["node"],
             elapsedTime * 1000,
             max(totalMemory, 0.0),
@@ -28,73 +29,97 @@ def getOutput(weights, maze):
 
 
 class Sokoban:
-    def __init__(self, maze, weights):
-        self.maze = maze
-        self.start_position = None
-        self.stones = []
-        stoneIter = iter(weights)
-        for i in range(len(maze)):
-            for j in range(len(maze[i])):
-                if maze[i][j] == "@" or maze[i][j] == "+":
-                    self.start_position = (i, j)
-
-                if maze[i][j] == "$" or maze[i][j] == "*":
-                    self.stones.append((i, j, next(stoneIter)))
-
+    def __init__(self, maze, weights, engine=Board):
+        self.board = engine(weights, maze)
         self.result = {"trace": "", "steps": 0, "weight": 0, "node": 0}
 
     def isGoal(self, state):
-        stones = state[1:]
-        for stone in stones:
-            if (
-                self.maze[stone[0]][stone[1]] != "."
-                and self.maze[stone[0]][stone[1]] != "*"
-                and self.maze[stone[0]][stone[1]] != "+"
-            ):
-                return False
-        return True
-
-    def isFreeSpace(self, pos, stones):
-        if self.maze[pos[0]][pos[1]] == "#":
-            return False
-
-        for stone in stones:
-            if stone[0] == pos[0] and stone[1] == pos[1]:
-                return False
-
-        return True
-
-    def getNeighbors(self, player, stones):
-        neighbors = []
-        for move, direction in DIRECTIONS.items():
-            nextPos = (player[0] + direction[0], player[1] + direction[1])
-            if not self.isFreeSpace(nextPos, stones):
+        return self.board.isGoal(state)
+
+    def getNeighbors(self, state):
+        # Last successor first, the order a stack of all of them would pop
+        return reversed(list(self.board.successors(state)))
+
+    def search(self, depthLimit, depthAware):
+        """
+        Run one depth-first search from the initial state.
+
+        The path is kept as a single stack of move codes: a move is pushed when
+        the search descends and popped when it backtracks, and every level of the
+        search only holds an iterator over its remaining successors.
+
+        Parameters:
+            depthLimit (int): The number of moves the search may go deep.
+            depthAware (bool): Whether a state is searched again when it is
+                reached in fewer moves than before. Without it, every state is
+                searched at most once.
+
+        Returns:
+            bool: True if a goal was found, the solution is then in `self.result`.
+        """
+        board = self.board
+        startState = board.initialState()
+        # The fewest moves each state was reached with, and the state itself
+        # when keys are hashes, to check them (see Board.checkedKey)
+        visited = {board.key(startState): 0}
+        states = None if board.exactKeys else {board.key(startState): startState}
+        moves = array(board.moveType)
+        costs = [0]  # The path cost after each move on the stack
+        stack = [self.getNeighbors(startState)]
+
+        while stack:
+            successor = next(stack[-1], None)
+            if successor is None:
+                stack.pop()
+                if moves:
+                    moves.pop()
+                    costs.pop()
                 continue
 
-            state = (nextPos, *sorted(stones))
-            neighbor = {"move": move, "state": state, "cost": 1}
-            neighbors.append(neighbor)
-
-        for move, direction in PUSH_DIRECTIONS.items():
-            nextPos = (player[0] + direction[0], player[1] + direction[1])
-            nextNextPos = (player[0] + 2 * direction[0], player[1] + 2 * direction[1])
-
-            for stone in stones:
-                if stone[0] == nextPos[0] and stone[1] == nextPos[1]:
-                    if not self.isFreeSpace(nextNextPos, stones):
-                        continue
-
-                    newStones = [s for s in stones if s != stone]
-                    newStones.append((nextNextPos[0], nextNextPos[1], stone[2]))
-                    state = (nextPos, *sorted(newStones))
-
-                    neighbor = {"move": move, "state": state, "cost": 1 + stone[2]}
-                    neighbors.append(neighbor)
-                    break
-
-        return neighbors
+            move, cost, state = successor
+            depth = len(stack)
+            key = board.key(state)
+            if states is not None and key in visited:
+                key = board.checkedKey(key, state, states[key])
+            if key in visited and (not depthAware or visited[key] <= depth):
+                continue
+            visited[key] = depth
+            if states is not None:
+                states[key] = state
+            self.result["node"] += 1
 
-    def solve(self):
+            moves.append(move)
+            costs.append(costs[-1] + cost)
+            if self.isGoal(state):
+                self.result["trace"] = board.pathString(moves)
+                self.result["steps"] = len(self.result["trace"])
+                self.result["weight"] = costs[-1] - board.moveCount(moves)
+                return True
+
+            if depth < depthLimit:
+                stack.append(self.getNeighbors(state))
+            else:
+                moves.pop()
+                costs.pop()
+
+        return False
+
+    def solve(self, iterativeDeepening=False):
+        """
+        Search for a solution at most `DEPTH_THRESHOLD` moves long.
+
+        With `iterativeDeepening`, the depth limit starts at 1 and grows by one
+        after every search that fails, so the solution found uses as few moves
+        as possible. Otherwise a search runs with the full depth limit, searching
+        every state once. That search can miss a solution, since a state first
+        reached close to the limit is not searched again when a shorter path to
+        it turns up, so when it fails it is repeated depth-aware.
+
+        Returns:
+            foundResult (bool): Whether a solution was found.
+            elapsedTime (float): The time taken in seconds.
+            totalMemory (float): The memory used in megabytes.
+        """
         # if time.time() - self.start_time > 5:
         #     self.result['trace'] = "TLE"
         #     return False
@@ -104,39 +129,16 @@ class Sokoban:
         process = psutil.Process()
         startMemory = process.memory_info().rss / (1024 * 1024)
 
-        visited = set()
-        startState = (self.start_position, *sorted(self.stones))
-        stateStack = [(startState, "", 0, 0, 0)]
-        foundResult = self.isGoal(startState)
-
-        while stateStack and not foundResult:
-            state, path, totalStep, totalWeight, depth = stateStack.pop()
-            visited.add(state)
-            self.result["node"] += 1
-            if depth > DEPTH_THRESHOLD:
-                continue
-
-            neighbors = self.getNeighbors(state[0], state[1:])
-            for neighbor in neighbors:
-                if self.isGoal(neighbor["state"]):
-                    self.result["steps"] = totalStep + 1
-                    self.result["weight"] = totalWeight + neighbor["cost"]
-                    self.result["trace"] = path + neighbor["move"]
+        foundResult = self.isGoal(self.board.initialState())
+        if not foundResult and iterativeDeepening:
+            for depthLimit in range(1, DEPTH_THRESHOLD + 1):
+                if self.search(depthLimit, True):
                     foundResult = True
                     break
-
-            for neighbor in neighbors:
-                if neighbor["state"] in visited:
-                    continue
-                stateStack.append(
-                    (
-                        neighbor["state"],
-                        path + neighbor["move"],
-                        totalStep + 1,
-                        totalWeight + neighbor["cost"],
-                        depth + 1,
-                    )
-                )
+        elif not foundResult:
+            foundResult = self.search(DEPTH_THRESHOLD, False) or self.search(
+                DEPTH_THRESHOLD, True
+            )
 
         elapsedTime = time.time() - startTime
         totalMemory = process.memory_info().rss / (1024 * 1024) - startMemory
@@ -0,0 +1,189 @@
+import os
+from heapq import heappush, heappop
+
+CACHE_DIR = os.path.join("Cache", "Deadlocks")
+MAX_PATTERN = 3  # Most stones in a pattern
+SEARCH_LIMIT = 500  # States a check may visit before giving up on a pattern
+
+
+class DeadlockTable:
+    """
+    Small sets of stone cells that can never all be pushed onto switches.
+
+    When a push leaves the pushed stone next to other stones, the stone and its
+    neighbors (up to `MAX_PATTERN` stones, pairs first) are solved on their own,
+    with every other stone removed and the player starting in every region around
+    them. If no push sequence puts all of them on switches, the cells are a
+    deadlock pattern: removing stones never makes a maze harder, so any state
+    holding the same cells is dead too.
+
+    Patterns are indexed by each of their cells, so a push only looks at the
+    patterns of the cell the stone lands on. The checks only depend on the walls
+    and the switches, so their results are appended to a file under `cacheDir`
+    named after `Board.layoutKey` as soon as they are found, one per line: a 1
+    followed by the cells of a pattern, or a 0 followed by the cells of a
+    solvable configuration. Later runs on the same maze start with them.
+    Configurations the checks gave up on are only kept in memory, so that nothing
+    on disk claims more than was proven.
+
+    The table is used by the boards with `learnDeadlocks`, see `LearningBoard`.
+
+    Attributes:
+        patterns (list[list[tuple[int]]]): For every cell, the patterns that
+            include it.
+        safe (set[tuple[int]]): The configurations found solvable or too large
+            to decide, which are not checked again.
+    """
+
+    def __init__(self, board, cacheDir=CACHE_DIR):
+        self.board = board
+        # The pushes from each cell to the nearest switch, to guide the checks
+        self.distance = [
+            min((d[cell] for d in board.pushDistances if d[cell] >= 0), default=-1)
+            for cell in range(board.size)
+        ]
+        self.patterns = [[] for _ in range(board.size)]
+        self.safe = set()
+        self.path = None
+        if cacheDir is not None:
+            os.makedirs(cacheDir, exist_ok=True)
+            self.path = os.path.join(cacheDir, board.layoutKey() + ".txt")
+            if os.path.exists(self.path):
+                with open(self.path, "r") as f:
+                    for line in f:
+                        dead, *cells = map(int, line.split())
+                        if dead:
+                            self._add(tuple(cells))
+                        else:
+                            self.safe.add(tuple(cells))
+
+    def _add(self, pattern):
+        for cell in pattern:
+            self.patterns[cell].append(pattern)
+
+    def _save(self, dead, cells):
+        if self.path is not None:
+            with open(self.path, "a") as f:
+                f.write(" ".join(map(str, (dead,) + cells)) + "\n")
+
+    def learn(self, pattern):
+        self._add(pattern)
+        self._save(1, pattern)
+
+    def markSafe(self, configuration):
+        self.safe.add(configuration)
+        self._save(0, configuration)
+
+    def around(self, stones, stone):
+        """
+        The stones among the 8 cells around `stone`, within its rows and columns.
+        """
+        width = self.board.width
+        row, col = divmod(stone, width)
+        around = []
+        for nextRow in range(max(row - 1, 0), min(row + 2, self.board.height)):
+            for nextCol in range(max(col - 1, 0), min(col + 2, width)):
+                cell = nextRow * width + nextCol
+                if cell != stone and cell in stones:
+                    around.append(cell)
+        return around
+
+    def isDeadlock(self, stones, stone):
+        """
+        Check whether the stones around a freshly pushed stone form a deadlock,
+        solving the configurations not seen before.
+
+        Parameters:
+            stones (Container[int]): The cells of all stones after the push.
+            stone (int): The cell of the pushed stone.
+
+        Returns:
+            bool: True if the position can never be solved.
+        """
+        for pattern in self.patterns[stone]:
+            if all(cell in stones for cell in pattern):
+                return True
+
+        around = self.around(stones, stone)
+        candidates = [tuple(sorted((stone, cell))) for cell in around]
+        if 1 < len(around) < MAX_PATTERN:
+            candidates.append(tuple(sorted([stone] + around)))
+
+        for candidate in candidates:
+            if candidate in self.safe:
+                continue
+            solvable = self.isSolvable(candidate)
+            if solvable is None:
+                self.safe.add(candidate)
+            elif solvable:
+                self.markSafe(candidate)
+            else:
+                self.learn(candidate)
+                return True
+        return False
+
+    def isSolvable(self, stones):
+        """
+        Search the pushes of the given stones alone, from every player region
+        around them, for a state with all of them on switches. The states with
+        the stones closest to the switches go first, so a solvable configuration
+        is usually settled within a few states.
+
+        Returns:
+            solvable (bool): Whether the stones can all reach switches, None when
+                the search gave up after `SEARCH_LIMIT` states.
+        """
+        board = self.board
+        neighbors = board.neighbors
+        if all(board.switch[cell] for cell in stones):
+            return True
+
+        def region(player, stones):
+            reach = bytearray(board.size)
+            for cell in stones:
+                reach[cell] = 2
+            reach[player] = 1
+            cells = [player]
+            for cell in cells:
+                for nextCell in neighbors[cell]:
+                    if nextCell >= 0 and not reach[nextCell]:
+                        reach[nextCell] = 1
+                        cells.append(nextCell)
+            return reach, min(cells)
+
+        distance = self.distance
+        # Entries are (pushes left to the nearest switches, player region, stones)
+        queue = []
+        visited = set()
+        for stone in stones:
+            for cell in neighbors[stone]:
+                if cell >= 0 and cell not in stones:
+                    state = (region(cell, stones)[1], stones)
+                    if state not in visited:
+                        visited.add(state)
+                        heappush(queue, (sum(distance[s] for s in stones),) + state)
+
+        while queue:
+            pushesLeft, player, current = heappop(queue)
+            if all(board.switch[cell] for cell in current):
+                return True
+            if len(visited) > SEARCH_LIMIT:
+                return None
+
+            reach = region(player, current)[0]
+            for index, cell in enumerate(current):
+                for direction, target in enumerate(neighbors[cell]):
+                    behind = neighbors[cell][direction ^ 1]  # The opposite direction
+                    if target < 0 or behind < 0 or reach[behind] != 1:
+                        continue
+                    if reach[target] == 2 or board.dead[target]:
+                        continue
+                    moved = current[:index] + (target,) + current[index + 1 :]
+                    moved = tuple(sorted(moved))
+                    state = (region(cell, moved)[1], moved)
+                    if state not in visited:
+                        visited.add(state)
+                        pushesLeft = sum(distance[s] for s in moved)
+                        heappush(queue, (pushesLeft,) + state)
+
+        return False
@@ -0,0 +1,82 @@
+import numpy as np
+
+
+def _floorAndNeighbors(board):
+    floor = np.frombuffer(bytes(board.wall), dtype=np.uint8) == 0
+    neighbors = np.array(board.neighbors, dtype=np.intp).reshape(board.size, 4)
+    return floor, neighbors
+
+
+def _spread(board, sources, edges):
+    """
+    Breadth-first search from every source at once, one row per source.
+
+    Parameters:
+        board (Board): The board the cells belong to.
+        sources (Sequence[int]): The cell each row starts from.
+        edges (list[tuple[ndarray, ndarray]]): Pairs of cell arrays `(fromCells,
+            toCells)`, one per direction, such that the search may go from
+            `fromCells[k]` to `toCells[k]`. The `toCells` of a pair are distinct.
+
+    Returns:
+        distances (ndarray): An int32 array of shape `(len(sources), size)`,
+            -1 for the cells a row never reaches.
+    """
+    rows = np.arange(len(sources))
+    distances = np.full((len(sources), board.size), -1, dtype=np.int32)
+    frontier = np.zeros((len(sources), board.size), dtype=bool)
+    frontier[rows, np.asarray(sources, dtype=np.intp)] = True
+    reached = frontier.copy()
+
+    step = 0
+    while frontier.any():
+        distances[frontier] = step
+        step += 1
+        nextFrontier = np.zeros_like(frontier)
+        for fromCells, toCells in edges:
+            nextFrontier[:, toCells] |= frontier[:, fromCells]
+        frontier = nextFrontier & ~reached
+        reached |= frontier
+
+    return distances
+
+
+def walkingDistances(board):
+    """
+    The steps the player needs between every pair of cells, ignoring stones.
+
+    Returns:
+        distances (ndarray): `distances[a, b]` for cells `a` and `b`, -1 when
+            either is a wall or `b` cannot be reached from `a`.
+    """
+    floor, neighbors = _floorAndNeighbors(board)
+    edges = []
+    for direction in range(4):
+        fromCells = np.flatnonzero(floor & (neighbors[:, direction] >= 0))
+        edges.append((fromCells, neighbors[fromCells, direction]))
+
+    distances = np.full((board.size, board.size), -1, dtype=np.int32)
+    cells = np.flatnonzero(floor)
+    distances[cells] = _spread(board, cells, edges)
+    return distances
+
+
+def pushDistances(board, targets):
+    """
+    The pushes a lone stone needs from every cell to each of `targets`, found by
+    pulling it away from the targets breadth-first, ignoring other stones.
+
+    Returns:
+        distances (ndarray): `distances[i, cell]` for the target `targets[i]`,
+            -1 when the stone cannot be pushed there from `cell`.
+    """
+    floor, neighbors = _floorAndNeighbors(board)
+    pushTargets = np.array(board.pushTargets, dtype=np.intp).reshape(board.size, 4)
+    edges = []
+    for direction in range(4):
+        # The stone is pulled from the cell to its neighbor, and the player needs
+        # room one step further
+        fromCells = np.flatnonzero(floor & (pushTargets[:, direction] >= 0))
+        edges.append((fromCells, neighbors[fromCells, direction]))
+
+    return _spread(board, targets, edges)
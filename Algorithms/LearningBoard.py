@@ -0,0 +1,25 @@
+from Algorithms.Board import Board
+from Algorithms.PushBoard import PushBoard
+
+
+class LearningBoard(Board):
+    """
+    A `Board` that also checks every push against the deadlock patterns it
+    learns, see `DeadlockTable`.
+
+    The checks solve small sets of stones on their own, which costs more than it
+    prunes on small mazes: on input-08 and input-09, A* takes 1.7 to 1.9 times as
+    long on a fresh maze, and 10-20% longer once the patterns are cached on disk.
+    It is meant for larger mazes, whose deadlocks often span a few stones in a
+    way `Board.isFreezeDeadlock` cannot see.
+    """
+
+    learnDeadlocks = True
+
+
+class LearningPushBoard(PushBoard):
+    """
+    A `PushBoard` that learns deadlock patterns like `LearningBoard`.
+    """
+
+    learnDeadlocks = True
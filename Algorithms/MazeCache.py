@@ -0,0 +1,248 @@
+import os
+import pickle
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from Algorithms.DistanceTables import pushDistances, walkingDistances
+
+CACHE_DIR = os.path.join("Cache", "Mazes")
+CACHE_VERSION = 1  # Bumped whenever CompiledMaze changes, so old files are ignored
+CACHE_SIZE = 16  # Compiled mazes kept in memory
+ROOM_SIZE = 64  # Cells past a door, at most, for it to be analyzed as a goal room
+
+OPPOSITE = (1, 0, 3, 2)  # The reverse of each direction
+
+_compiled = OrderedDict()  # Layout key -> CompiledMaze, least recently used first
+
+
+class CompiledMaze:
+    """
+    The static analysis of a maze: everything that only depends on its walls and
+    switches, shared by every board of the same layout (see `Board` for the
+    meaning of each table).
+
+    Attributes:
+        neighbors (list[tuple[int]]): See `Board.neighbors`.
+        pushTargets (list[tuple[int]]): See `Board.pushTargets`.
+        pushDistances (list[list[int]]): See `Board.pushDistances`.
+        walkDistances (list[list[int]]): See `Board.walkDistances`.
+        dead (bytearray): See `Board.dead`.
+        tunnel (bytearray): See `PushBoard.tunnel`.
+        goalRooms (list[tuple]): See `PushBoard.goalRooms`.
+    """
+
+    def __init__(self, board):
+        self.width = board.width
+        self.height = board.height
+        self.size = board.size
+        self.wall = board.wall
+
+        self.neighbors = [self._neighbors(cell) for cell in range(self.size)]
+        self.pushTargets = [
+            tuple(
+                -1 if nextCell < 0 else self.neighbors[nextCell][direction]
+                for direction, nextCell in enumerate(self.neighbors[cell])
+            )
+            for cell in range(self.size)
+        ]
+        # Both tables are built with NumPy, see DistanceTables
+        switchDistances = pushDistances(self, board.switches)
+        self.pushDistances = switchDistances.tolist()
+        self.walkDistances = walkingDistances(self).tolist()
+        self.dead = bytearray(
+            (switchDistances < 0).all(axis=0)
+            & (np.frombuffer(bytes(self.wall), np.uint8) == 0)
+        )
+        self.tunnel = self._tunnels(board.switch)
+        self.goalRooms = self._goalRooms(board.switch)
+
+    def _neighbors(self, cell):
+        row, col = divmod(cell, self.width)
+        candidates = (
+            cell - self.width if row > 0 else -1,
+            cell + self.width if row < self.height - 1 else -1,
+            cell - 1 if col > 0 else -1,
+            cell + 1 if col < self.width - 1 else -1,
+        )
+        return tuple(
+            -1 if nextCell < 0 or self.wall[nextCell] else nextCell
+            for nextCell in candidates
+        )
+
+    def _tunnels(self, switch):
+        neighbors = self.neighbors
+        tunnel = bytearray(4 * self.size)
+        for cell in range(self.size):
+            if self.wall[cell] or switch[cell]:
+                continue
+            for direction in range(4):
+                behind = neighbors[cell][OPPOSITE[direction]]
+                sides = (2, 3) if direction < 2 else (0, 1)
+                if behind >= 0 and all(
+                    neighbors[cell][side] < 0 and neighbors[behind][side] < 0
+                    for side in sides
+                ):
+                    tunnel[cell * 4 + direction] = 1
+        return tunnel
+
+    def _goalRooms(self, switch):
+        neighbors = self.neighbors
+        rooms = {}  # The switches of a room -> the smallest room holding them
+        for entrance in range(self.size):
+            if self.wall[entrance] or switch[entrance]:
+                continue
+            for direction, first in enumerate(neighbors[entrance]):
+                behind = neighbors[entrance][OPPOSITE[direction]]
+                if first < 0 or behind < 0:
+                    continue
+                # The room is what lies past the door, if the door is the only way in
+                room = {first}
+                cells = [first]
+                for cell in cells:
+                    if len(room) > ROOM_SIZE or behind in room:
+                        break
+                    for nextCell in neighbors[cell]:
+                        if nextCell >= 0 and nextCell != entrance:
+                            if nextCell not in room:
+                                room.add(nextCell)
+                                cells.append(nextCell)
+                if behind in room or len(room) > ROOM_SIZE:
+                    continue
+                if sum(cell in room for cell in neighbors[entrance]) > 1:
+                    continue
+                goals = frozenset(cell for cell in room if switch[cell])
+                if len(goals) < 2:
+                    continue
+                if goals in rooms and len(rooms[goals][2]) <= len(room):
+                    continue
+                order, routes = self._fillOrder(room, goals, entrance, direction)
+                if order:
+                    rooms[goals] = (entrance, direction, frozenset(room), order, routes)
+        return sorted(rooms.values())
+
+    def _fillOrder(self, room, goals, entrance, direction):
+        """
+        Order the switches of a room so that each one can be filled by a stone
+        pushed in through the door while the ones before it are filled, deepest
+        first.
+
+        Returns:
+            order (tuple[int]): The switches in the order to fill them, None
+                when no such order was found.
+            routes (tuple[tuple[int]]): For every switch, the directions of the
+                pushes that take the stone on from the first cell past the door.
+        """
+        filled = set()
+        order = []
+        routes = []
+        while len(filled) < len(goals):
+            reached = self._roomRoutes(room, filled, entrance, direction)
+            reached = {cell: route for cell, route in reached.items() if cell in goals}
+            # The deepest switch that keeps all the others reachable
+            for goal in sorted(reached, key=lambda cell: (-len(reached[cell]), cell)):
+                rest = self._roomRoutes(room, filled | {goal}, entrance, direction)
+                if all(cell in rest for cell in goals - filled - {goal}):
+                    break
+            else:
+                return None, None
+            order.append(goal)
+            routes.append(reached[goal])
+            filled.add(goal)
+        return tuple(order), tuple(routes)
+
+    def _roomRoutes(self, room, filled, entrance, direction):
+        """
+        The fewest pushes that take a lone stone from the first cell past the door
+        of a room to each cell that is not `filled`, after which the player can
+        still walk out of the door.
+
+        Returns:
+            routes (dict[int, tuple[int]]): The directions of the pushes for every
+                cell that can be reached.
+        """
+        neighbors = self.neighbors
+        free = room - filled
+        free.add(entrance)
+
+        def region(player, stone):
+            cells = {player}
+            stack = [player]
+            while stack:
+                for nextCell in neighbors[stack.pop()]:
+                    if nextCell in free and nextCell != stone and nextCell not in cells:
+                        cells.add(nextCell)
+                        stack.append(nextCell)
+            return cells
+
+        # Every state is (stone, smallest cell of the player's region) -> the
+        # directions of the pushes so far
+        routes = {}
+        first = neighbors[entrance][direction]
+        previous = {(first, entrance): ()}
+        queue = deque([(first, entrance)])
+        while queue:
+            stone, player = queue.popleft()
+            pushes = previous[(stone, player)]
+            walk = region(player, stone)
+            if stone not in routes and entrance in walk:
+                routes[stone] = pushes
+            for push, target in enumerate(neighbors[stone]):
+                behind = neighbors[stone][OPPOSITE[push]]
+                if target == entrance or target not in free or self.dead[target]:
+                    continue
+                if behind not in walk:
+                    continue
+                state = (target, min(region(stone, target)))
+                if state not in previous:
+                    previous[state] = pushes + (push,)
+                    queue.append(state)
+        return routes
+
+
+def compiledMaze(board, onDisk=False):
+    """
+    Get the static analysis of the board's layout, compiling it only when it is
+    neither among the `CACHE_SIZE` most recently used layouts nor, with
+    `onDisk`, stored under `CACHE_DIR`. The files are named after the layout and
+    `CACHE_VERSION`, and written to a temporary file first, so that a solver
+    stopped midway never leaves a partial one behind.
+
+    Parameters:
+        board (Board): A board whose grid has been read, see `Board.layoutKey`.
+        onDisk (bool): Whether to look for the compiled maze on disk, and store
+            it there once compiled.
+
+    Returns:
+        compiled (CompiledMaze): The shared analysis, which must not be modified.
+    """
+    key = board.layoutKey()
+    compiled = _compiled.get(key)
+    if compiled is not None:
+        _compiled.move_to_end(key)
+        return compiled
+
+    path = os.path.join(CACHE_DIR, f"{key}-v{CACHE_VERSION}.pkl")
+    if onDisk and os.path.exists(path):
+        with open(path, "rb") as f:
+            compiled = pickle.load(f)
+    else:
+        compiled = CompiledMaze(board)
+        if onDisk:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as f:
+                pickle.dump(compiled, f)
+            os.replace(temporary, path)
+
+    _compiled[key] = compiled
+    if len(_compiled) > CACHE_SIZE:
+        _compiled.popitem(last=False)
+    return compiled
+
+
+def clearCompiledMazes():
+    """
+    Forget the compiled mazes kept in memory.
+    """
+    _compiled.clear()
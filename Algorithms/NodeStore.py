@@ -0,0 +1,59 @@
+from array import array
+
+
+class NodeStore:
+    """
+    Search tree nodes kept in parallel `array` columns and addressed by integer id.
+
+    Every node costs one entry in each column (a parent id, a move code and the
+    path cost from the root), instead of an object or tuple per node.
+
+    Attributes:
+        parent (array): The id of the parent of each node, -1 for a root.
+        move (array): The move code that led to each node from its parent.
+        cost (array): The total path cost from the root to each node.
+        states (list[tuple]): The state of each node, for boards whose keys are
+            hashes (see `Board.checkedKey`), None otherwise.
+    """
+
+    def __init__(self, moveType="B", keepStates=False):
+        self.parent = array("i")
+        self.move = array(moveType)
+        self.cost = array("q")
+        self.states = [] if keepStates else None
+
+    def __len__(self):
+        return len(self.parent)
+
+    def add(self, parent, move, cost, state=None):
+        """
+        Append a node and return its id. `state` is only kept with `keepStates`.
+        """
+        self.parent.append(parent)
+        self.move.append(move)
+        self.cost.append(cost)
+        if self.states is not None:
+            self.states.append(state)
+        return len(self.parent) - 1
+
+    def depth(self, node):
+        depth = 0
+        parent = self.parent
+        while parent[node] != -1:
+            node = parent[node]
+            depth += 1
+        return depth
+
+    def moves(self, node):
+        """
+        The move codes from the root to the given node, by walking parent ids.
+        """
+        moves = array(self.move.typecode, bytes(self.move.itemsize * self.depth(node)))
+        parent = self.parent
+        move = self.move
+        index = len(moves)
+        while parent[node] != -1:
+            index -= 1
+            moves[index] = move[node]
+            node = parent[node]
+        return moves
@@ -0,0 +1,324 @@
+import time
+import psutil
+from heapq import heappush, heappop
+
+from Algorithms.Assignment import INF, minimumCostAssignment
+from Algorithms.PushBoard import OPPOSITE, PushBoard
+
+JOINT_LIMIT = 5000  # States a joint search may expand before giving up
+BACKTRACK_LIMIT = 1000  # The same, for every joint search when backtracking
+JOINT_WEIGHT = 2  # How much more the pushes left weigh than the pushes made
+
+
+def pullRegion(board, switch, blocked):
+    """
+    The cells a lone stone on `switch` can be pulled to, treating the `blocked`
+    cells as walls.
+    """
+    neighbors = board.neighbors
+    region = {switch}
+    cells = [switch]
+    for cell in cells:
+        for direction in range(4):
+            # The stone is pulled onto `previous`, the player backing onto `behind`
+            previous = neighbors[cell][direction]
+            if previous < 0 or previous in blocked or previous in region:
+                continue
+            behind = neighbors[previous][direction]
+            if behind < 0 or behind in blocked:
+                continue
+            region.add(previous)
+            cells.append(previous)
+    return region
+
+
+def lastScore(board, switch, filled):
+    """
+    How good a switch is to fill last among the `filled` ones: the number of
+    starting stones and of cells a stone on it can be pulled back to with the
+    others in place, ties going to the smallest cell.
+    """
+    region = pullRegion(board, switch, filled - {switch})
+    starts = sum(stone in region for stone in board.stones)
+    return starts, len(region), -switch
+
+
+def packingOrder(board):
+    """
+    Find an order to fill the switches in that keeps the switches left open.
+
+    The order is built backward from the solved maze: with every switch filled,
+    the switch that is filled last is one whose stone can still be pulled out
+    with all the others in place, preferably back to many of the starting stones.
+    Its stone is taken away and the analysis repeats on the switches left.
+
+    Returns:
+        order (list[int]): The switch cells, in the order to fill them.
+    """
+    filled = set(board.switches)
+    order = []
+    while filled:
+        scores = {switch: lastScore(board, switch, filled) for switch in filled}
+        last = max(scores, key=scores.get)
+        order.append(last)
+        filled.remove(last)
+    return order[::-1]
+
+
+def pushAlone(board, state, index, goal, filled):
+    """
+    Push one stone onto `goal` with the fewest pushes, leaving the other stones
+    where they are.
+
+    Parameters:
+        board (PushBoard): The board to push on.
+        state (tuple[int, tuple[int]]): The state to start from.
+        index (int): The index of the stone to push.
+        goal (int): The cell to push the stone to.
+        filled (set[int]): The switches filled once the stone is on `goal`, which
+            must not leave any other stone `walledOff`.
+
+    Returns:
+        moves (list[int]): The move codes of the pushes, see `PushBoard`, or None
+            when the stone cannot get there alone.
+        state (tuple[int, tuple[int]]): The state after the pushes.
+        nodes (int): The number of states generated.
+    """
+    player, stones = state
+    if stones[index] == goal and not walledOff(board, state, filled):
+        return [], state, 1
+
+    neighbors = board.neighbors
+    start = board.normalize(state)
+    # Every state is stored as (stone cell, player region) -> (previous, move)
+    previous = {(stones[index], start[0]): None}
+    layer = [(player, stones[index])]
+    while layer:
+        nextLayer = []
+        for player, stone in layer:
+            current = stones[:index] + (stone,) + stones[index + 1 :]
+            reach, region = board.reachable(player, current)
+            currentKey = (stone, min(region))
+            for direction, target in enumerate(neighbors[stone]):
+                if target < 0 or reach[target] == 2 or board.dead[target]:
+                    continue
+                behind = neighbors[stone][OPPOSITE[direction]]
+                if behind < 0 or reach[behind] != 1:
+                    continue
+                newStones = stones[:index] + (target,) + stones[index + 1 :]
+                if target != goal and board.isFreezeDeadlock(newStones, target):
+                    continue
+                newKey = (target, min(board.reachable(stone, newStones)[1]))
+                if newKey in previous:
+                    continue
+                previous[newKey] = (currentKey, stone * 4 + direction)
+                if target == goal and not walledOff(board, (stone, newStones), filled):
+                    moves = []
+                    while previous[newKey] is not None:
+                        newKey, move = previous[newKey]
+                        moves.append(move)
+                    return moves[::-1], (stone, newStones), len(previous)
+                nextLayer.append((stone, target))
+        layer = nextLayer
+
+    return None, state, len(previous)
+
+
+def jointSearch(board, state, goals, limit=JOINT_LIMIT, fixed=()):
+    """
+    Push any stones but the ones on `fixed` cells, with a weighted A* search on
+    the number of pushes, until every cell of `goals` holds a stone and no other
+    stone is `walledOff` by them.
+
+    Returns:
+        moves (list[int]): The move codes of the pushes, or None when no such
+            state was found within `limit` expanded states.
+        state (tuple[int, tuple[int]]): The state reached.
+        cost (int): The cost of the pushes.
+        nodes (int): The number of states generated.
+    """
+    distances = dict(zip(board.switches, board.pushDistances))
+
+    def estimate(stones):
+        # The fewest pushes that bring free stones onto the empty goals
+        free = [stone for stone in stones if stone not in goals]
+        return minimumCostAssignment(
+            [
+                [INF if d[stone] < 0 else d[stone] for stone in free]
+                for d in (distances[goal] for goal in goals if goal not in stones)
+            ]
+        )
+
+    # Entries are (priority, estimate, pushes, cost, tie breaker, state, moves)
+    queue = [(0, estimate(state[1]), 0, 0, 0, state, [])]
+    visited = {board.key(state)}
+    expanded = 0
+    while queue and expanded < limit:
+        _, h, pushes, cost, _, state, moves = heappop(queue)
+        if h == 0 and not walledOff(board, state, goals):
+            return moves, state, cost, len(visited)
+        expanded += 1
+        for move, moveCost, newState in board.successors(state):
+            if move % (4 * board.size) // 4 in fixed:
+                continue
+            newKey = board.key(newState)
+            if newKey in visited:
+                continue
+            visited.add(newKey)
+            h = estimate(newState[1])
+            if h == INF:
+                continue
+            newPushes = pushes + board.moveCount((move,))
+            heappush(
+                queue,
+                (
+                    newPushes + JOINT_WEIGHT * h,
+                    h,
+                    newPushes,
+                    cost + moveCost,
+                    len(visited),
+                    newState,
+                    moves + [move],
+                ),
+            )
+
+    return None, state, 0, len(visited)
+
+
+def pushCost(board, index, cell, switch):
+    """
+    The cost of pushing a stone from `cell` onto `switch` alone, infinite when it
+    cannot.
+    """
+    pushes = board.pushDistances[board.switches.index(switch)][cell]
+    return INF if pushes < 0 else pushes * (1 + board.weights[index])
+
+
+def walledOff(board, state, filled):
+    """
+    Check whether the stones on the `filled` switches keep the player away from
+    any other stone for good.
+    """
+    player, stones = state
+    reach = board.reachable(player, [stone for stone in stones if stone in filled])[0]
+    return any(reach[stone] != 1 for stone in stones if stone not in filled)
+
+
+def fillings(board, state, order, depth):
+    """
+    Generate the ways to fill the switch `order[depth]`, the switches before it
+    being filled already, best first.
+
+    The stones left are tried by the cost of pushing them onto the switch plus
+    the cheapest assignment of the others to the switches after it, each pushed
+    there while every other stone stays put (see `pushAlone`). Last comes a
+    `jointSearch` that may move all the stones left.
+
+    Yields:
+        moves (list[int]): The move codes of the pushes, None for a way that
+            failed.
+        state (tuple[int, tuple[int]]): The state after the pushes.
+        cost (int): The cost of the pushes.
+        nodes (int): The number of states generated to find them.
+    """
+    filled = set(order[:depth])
+    switch = order[depth]
+    stones = state[1]
+    left = [i for i, stone in enumerate(stones) if stone not in filled]
+    # The cost of pushing each stone left onto each switch left, alone
+    targets = order[depth:]
+    costs = {
+        i: [pushCost(board, i, stones[i], target) for target in targets] for i in left
+    }
+
+    def total(index):
+        if costs[index][0] == INF:
+            return INF
+        rest = [costs[i][1:] for i in left if i != index]
+        return costs[index][0] + minimumCostAssignment(rest)
+
+    filled.add(switch)
+    for index in sorted(left, key=total):
+        if costs[index][0] == INF:
+            break
+        moves, newState, nodes = pushAlone(board, state, index, switch, filled)
+        cost = 0 if moves is None else len(moves) * (1 + board.weights[index])
+        yield moves, newState, cost, nodes
+
+    yield jointSearch(board, state, filled, JOINT_LIMIT, filled - {switch})
+
+
+def getOutput(weights, grid, engine=PushBoard):
+    """
+    Solve the grid one switch at a time, for mazes with too many stones to
+    search jointly.
+
+    The switches are filled in the order given by `packingOrder`, each in the
+    first of its `fillings` that works. When none does, the search backtracks to
+    a `jointSearch` for all the switches filled so far and this one, from the
+    state before one of them was filled, the latest first. The solution is not
+    optimal, and is given up on when the joint searches fail.
+
+    Parameters:
+        weights (list[int]): A list of integer weights.
+        grid (list[list[char]]): A 2D list representing the grid to search.
+        engine (type): The push-level board to solve on, see `PushBoard`.
+
+    Returns:
+        path (str): A string representing the path from the start to the goal.
+        steps (int): The number of steps taken to reach the goal.
+        weight (int): The total weight Ares has to push.
+        node (int): The number of nodes generated by the algorithm.
+        time (int): The time taken to run the algorithm in milliseconds.
+        memory (int): The memory used by the algorithm in megabytes.
+    """
+    board = engine(weights, grid)
+    # A corral needs a push in every full solution, but not before every sub-goal
+    board.corralPruning = False
+
+    start_time = time.time()
+    process = psutil.Process()
+    start_memory = process.memory_info().rss
+
+    order = packingOrder(board)
+    generated = 0
+    # Every checkpoint is (switches filled, state, moves so far, cost so far)
+    checkpoints = [(0, board.initialState(), [], 0)]
+    while checkpoints[-1][0] < len(order):
+        depth, state, moves, cost = checkpoints[-1]
+        for pushed, newState, fillCost, nodes in fillings(board, state, order, depth):
+            generated += nodes
+            if pushed is not None:
+                checkpoints.append(
+                    (depth + 1, newState, moves + pushed, cost + fillCost)
+                )
+                break
+        else:
+            # Fill the switches jointly from the latest checkpoint they can be
+            # filled from
+            goals = set(order[: depth + 1])
+            for back in reversed(range(len(checkpoints))):
+                _, state, moves, cost = checkpoints[back]
+                pushed, newState, fillCost, nodes = jointSearch(
+                    board, state, goals, BACKTRACK_LIMIT
+                )
+                generated += nodes
+                if pushed is not None:
+                    del checkpoints[back + 1 :]
+                    checkpoints.append(
+                        (depth + 1, newState, moves + pushed, cost + fillCost)
+                    )
+                    break
+            else:
+                return None
+
+    _, state, moves, cost = checkpoints[-1]
+    path = board.pathString(moves)
+    return (
+        len(path),
+        cost - board.moveCount(moves),
+        generated,
+        (time.time() - start_time) * 1000,
+        max((process.memory_info().rss - start_memory) / 2**20, 0.0),
+        path,
+    )
@@ -0,0 +1,138 @@
+import hashlib
+import os
+from array import array
+
+from Algorithms.Assignment import INF
+from Algorithms.BucketQueue import BucketQueue
+from Algorithms.PushBoard import PushBoard
+
+CACHE_DIR = os.path.join("Cache", "Patterns")
+MAX_CELLS = 150  # Floor cells, at most, for a table to be worth building
+
+
+class PatternDatabase:
+    """
+    The exact cost of solving every placement of two stones alone in the maze.
+
+    The costs are found by a backward uniform-cost search that pulls the two
+    stones away from every pair of switches (see `PushBoard.predecessors`), and
+    the cost of a placement is the cheapest over all player positions. Since the
+    other stones are ignored, it is a lower bound on the cost of moving these two
+    stones in the full maze, and the bounds of disjoint pairs can be added up.
+
+    The table only depends on the walls, the switches and the two weights, and is
+    stored under `cacheDir` in a file named after a hash of them, so solving the
+    same maze again loads it instead of searching.
+
+    The search visits every placement of the two stones with every region of the
+    player, roughly the cube of the number of floor cells: a fraction of a second
+    for the 10x10 mazes, but about a minute for the 324 floor cells of
+    input-07. Solvers only build tables for mazes of at most `MAX_CELLS` floor
+    cells, see `worthBuilding`.
+
+    Attributes:
+        size (int): Number of cells of the maze.
+        costs (array): The cost of the placement with the first stone on cell `a`
+            and the second on cell `b` at index `a * size + b`, -1 when it cannot
+            be solved.
+    """
+
+    def __init__(self, grid, weights, cacheDir=CACHE_DIR):
+        """
+        Parameters:
+            grid (list[list[char]]): The maze, its stones are ignored.
+            weights (tuple[int, int]): The weights of the two stones.
+            cacheDir (str): The directory of the cached tables, None to always
+                search.
+        """
+        board = PushBoard(weights, self._pairGrid(grid))
+        self.size = board.size
+        path = None
+        if cacheDir is not None:
+            path = os.path.join(cacheDir, self.cacheKey(board) + ".bin")
+
+        self.costs = array("i")
+        # A file of the wrong size was cut short, it is searched again
+        length = self.size * self.size * self.costs.itemsize
+        if path is not None and os.path.exists(path):
+            if os.path.getsize(path) == length:
+                with open(path, "rb") as f:
+                    self.costs.fromfile(f, self.size * self.size)
+                return
+
+        self.costs = self._search(board)
+        if path is not None:
+            # Written to a temporary file first, so that a solver stopped midway
+            # never leaves a partial table behind
+            os.makedirs(cacheDir, exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as f:
+                self.costs.tofile(f)
+            os.replace(temporary, path)
+
+    @staticmethod
+    def _pairGrid(grid):
+        # Replace the stones by two new ones, placed anywhere but on the player
+        pairGrid = [
+            [{"$": " ", "*": "."}.get(char, char) for char in row] for row in grid
+        ]
+        placed = 0
+        for row in pairGrid:
+            for j, char in enumerate(row):
+                if placed < 2 and char in ". ":
+                    row[j] = "*" if char == "." else "$"
+                    placed += 1
+        return pairGrid
+
+    @staticmethod
+    def worthBuilding(board):
+        """
+        Whether the maze of the board is small enough for a table, see `MAX_CELLS`.
+        """
+        return board.size - sum(board.wall) <= MAX_CELLS
+
+    @staticmethod
+    def cacheKey(board):
+        """
+        A hash of everything the table depends on.
+        """
+        return hashlib.sha1(f"{board.layoutKey()}:{board.weights}".encode()).hexdigest()
+
+    def _search(self, board):
+        size = self.size
+        costs = array("i", [-1]) * (size * size)
+        symmetric = board.weights[0] == board.weights[1]
+
+        best = {}
+        queue = BucketQueue(board.maxMoveCost)
+        for state in board.goalStates():
+            key = board.key(state)
+            if key not in best:
+                best[key] = 0
+                queue.push(0, key)
+
+        while len(queue):
+            cost, key = queue.pop()
+            if cost > best[key]:
+                continue  # Stale entry, see UCS
+            player, (first, second) = board.unpack(key)
+            # The first time a placement comes out of the queue is its cheapest
+            if costs[first * size + second] < 0:
+                costs[first * size + second] = cost
+                if symmetric:
+                    costs[second * size + first] = cost
+
+            for move, pullCost, state in board.predecessors((player, (first, second))):
+                newKey = board.key(state)
+                if cost + pullCost < best.get(newKey, INF):
+                    best[newKey] = cost + pullCost
+                    queue.push(cost + pullCost, newKey)
+
+        return costs
+
+    def cost(self, first, second):
+        """
+        The cost of solving the placement with the stones on these cells.
+        """
+        cost = self.costs[first * self.size + second]
+        return INF if cost < 0 else cost
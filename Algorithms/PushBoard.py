@@ -0,0 +1,366 @@
+from collections import deque
+from itertools import combinations
+
+from Algorithms.Board import Board, MOVE_CHARS, PUSH
+from Algorithms.MazeCache import compiledMaze
+
+OPPOSITE = (1, 0, 3, 2)  # The reverse of each direction
+
+
+class PushBoard(Board):
+    """
+    A board whose moves are whole pushes instead of single player steps.
+
+    A state is a tuple `(player, stones)` as in `Board`, but two states are the
+    same when the player can walk between their positions: `key` stores the
+    smallest cell of the player's reachable region instead of the player cell. A
+    successor is any push of any stone the player can walk up to, and costs 1 plus
+    the stone weight; the walk itself is free, so solvers using this board minimize
+    pushes (and pushed weight) rather than steps.
+
+    A move code is `(pushes - 1) * 4 * size + stone * 4 + direction`, for `pushes`
+    pushes of the stone in a row. The walking segments are only rebuilt by
+    `pathString` when the solution is emitted.
+
+    With `corralPruning`, a state whose unreachable area holds a PI-corral only
+    offers the pushes into that corral, see `corralPushes`.
+
+    With `tunnelMacros`, a stone pushed into a tunnel is pushed on until it leaves
+    it in the same move, see `tunnel`.
+
+    With `goalMacros`, a stone pushed through the door of a goal room is pushed on
+    to the next switch of the room's fill order in the same move, see
+    `goalRooms`. The room has to hold the stones of the switches before it and
+    nothing else. This prunes every other way of filling the room, so solutions
+    may take more pushes than the optimum, and it is off by default.
+
+    Attributes:
+        tunnel (bytearray): Indexed by `cell * 4 + direction`, 1 when a stone
+            pushed onto `cell` in that direction is in a tunnel: a one-wide
+            corridor along the push, with walls on both sides of the stone and of
+            the player behind it, and no switch on `cell`. Such a stone can only
+            ever move along the corridor, and the player cannot get past it, so it
+            is pushed on right away.
+        goalRooms (list[tuple]): The goal rooms of the maze, as tuples `(door,
+            direction, cells, order, routes)`. A goal room is an area with at
+            least two switches that is only entered by pushing a stone from the
+            `door` cell in `direction`. Its switches are filled in `order`, and
+            `routes` gives for each of them the directions of the pushes that take
+            a stone on from the first cell past the door, with the switches before
+            it filled and the player able to walk back out.
+    """
+
+    pushLevel = True
+    moveType = "I"
+    corralPruning = True
+    tunnelMacros = True
+    goalMacros = False
+
+    def __init__(self, weights, grid):
+        super().__init__(weights, grid)
+        compiled = compiledMaze(self, self.cacheOnDisk)
+        self.tunnel = compiled.tunnel
+        self.goalRooms = compiled.goalRooms
+        # The room entered by a stone landing on a cell in a direction
+        self.roomEntries = {}
+        for room in self.goalRooms:
+            door, direction = room[:2]
+            self.roomEntries[self.neighbors[door][direction] * 4 + direction] = room
+
+        # A macro pushes one stone along a straight line, then through a room
+        pushes = max(self.width, self.height) if self.tunnelMacros else 1
+        if self.goalMacros:
+            pushes += max(
+                (len(route) for room in self.goalRooms for route in room[4]),
+                default=0,
+            )
+        self.maxMoveCost *= pushes
+
+    def reachable(self, player, stones):
+        """
+        Flood fill the cells the player can walk to without pushing.
+
+        Returns:
+            reach (bytearray): 1 for every reachable cell, 2 for every stone.
+            region (list[int]): The reachable cells.
+        """
+        reach = bytearray(self.size)
+        for stone in stones:
+            reach[stone] = 2
+        reach[player] = 1
+        region = [player]
+        neighbors = self.neighbors
+        for cell in region:
+            for nextCell in neighbors[cell]:
+                if nextCell >= 0 and not reach[nextCell]:
+                    reach[nextCell] = 1
+                    region.append(nextCell)
+        return reach, region
+
+    def normalize(self, state):
+        player, stones = state
+        return min(self.reachable(player, stones)[1]), stones
+
+    def key(self, state):
+        return super().key(self.normalize(state))
+
+    def corralPushes(self, stones, reach):
+        """
+        Find the PI-corral with the fewest pushes, if any.
+
+        A corral is a connected area of floor the player cannot reach, fenced by
+        stones. It is an I-corral when every push of its fence stones the player
+        can make goes into the corral, and a PI-corral when, in addition, the
+        player can reach every position needed to push a fence stone into it.
+        Unless the corral and its fence are already solved, some push into it is
+        needed in every solution, and the player cannot change the corral without
+        making one, so the others can be skipped.
+
+        Parameters:
+            stones (tuple[int]): The cells of the stones.
+            reach (bytearray): The player's reachability, see `reachable`.
+
+        Returns:
+            pushes (set[tuple[int, int]]): The `(stone, direction)` pushes into
+                the chosen corral, or None when there is no PI-corral.
+        """
+        neighbors = self.neighbors
+        corral = [0] * self.size  # The id of the corral of each cell, 0 for none
+        best = None
+        corralId = 0
+        for start in range(self.size):
+            if self.wall[start] or reach[start] or corral[start]:
+                continue
+            corralId += 1
+            corral[start] = corralId
+            cells = [start]
+            fence = set()
+            for cell in cells:
+                for nextCell in neighbors[cell]:
+                    if nextCell < 0:
+                        continue
+                    if reach[nextCell] == 2:
+                        fence.add(nextCell)
+                    elif not reach[nextCell] and not corral[nextCell]:
+                        corral[nextCell] = corralId
+                        cells.append(nextCell)
+
+            # Nothing to gain inside a corral that is already solved
+            if all(self.switch[stone] for stone in fence) and not any(
+                self.switch[cell] for cell in cells
+            ):
+                continue
+
+            pushes = set()
+            for stone in fence:
+                stoneNeighbors = neighbors[stone]
+                for direction, target in enumerate(stoneNeighbors):
+                    behind = stoneNeighbors[OPPOSITE[direction]]
+                    if target < 0 or behind < 0:
+                        continue
+                    if reach[target] == 2 or self.dead[target]:
+                        continue
+                    if corral[target] == corralId:
+                        if reach[behind] != 1:
+                            break  # Not P: a push into the corral is out of reach
+                        pushes.add((stone, direction))
+                    elif reach[behind] == 1:
+                        break  # Not I: the stone can be pushed out of the corral
+                else:
+                    continue
+                pushes = None
+                break
+
+            if pushes and (best is None or len(pushes) < len(best)):
+                best = pushes
+
+        return best
+
+    def roomRoute(self, target, direction, stones, index):
+        """
+        The pushes that take stone `index`, having landed on `target` in
+        `direction`, on to the next switch of a goal room, see `goalRooms`.
+
+        Returns:
+            route (tuple[int]): The directions of the pushes, None when the stone
+                did not enter a room or the room does not hold exactly the stones
+                of the switches before the next one.
+        """
+        room = self.roomEntries.get(target * 4 + direction)
+        if room is None:
+            return None
+        cells, order, routes = room[2:]
+        inside = {
+            stone for i, stone in enumerate(stones) if i != index and stone in cells
+        }
+        filled = len(inside)
+        if filled == len(order) or inside != set(order[:filled]):
+            return None
+        return routes[filled]
+
+    def successors(self, state):
+        player, stones = state
+        reach = self.reachable(player, stones)[0]
+        corralPushes = self.corralPushes(stones, reach) if self.corralPruning else None
+        neighbors = self.neighbors
+        for index, stone in enumerate(stones):
+            stoneNeighbors = neighbors[stone]
+            for direction, target in enumerate(stoneNeighbors):
+                if target < 0 or reach[target] == 2 or self.dead[target]:
+                    continue
+                behind = stoneNeighbors[OPPOSITE[direction]]
+                if behind < 0 or reach[behind] != 1:
+                    continue
+                if corralPushes and (stone, direction) not in corralPushes:
+                    continue
+
+                pushes = 1
+                player = stone
+                while True:
+                    route = None
+                    if self.goalMacros:
+                        route = self.roomRoute(target, direction, stones, index)
+                    if route is not None:
+                        for push in route:
+                            player, target = target, neighbors[target][push]
+                        pushes += len(route)
+                        break
+                    if not self.tunnelMacros or not self.tunnel[target * 4 + direction]:
+                        break
+                    nextTarget = neighbors[target][direction]
+                    if nextTarget < 0 or reach[nextTarget] == 2:
+                        break
+                    if self.dead[nextTarget]:
+                        break
+                    player, target = target, nextTarget
+                    pushes += 1
+
+                newStones = stones[:index] + (target,) + stones[index + 1 :]
+                if self.isDeadlock(newStones, target):
+                    continue
+                move = (pushes - 1) * 4 * self.size + stone * 4 + direction
+                yield move, pushes * (1 + self.weights[index]), (player, newStones)
+
+    def goalStates(self):
+        """
+        Generate every solved state, for searching backward from the goal.
+
+        The stones of each weight class take every combination of switches (see
+        `canonical`), and the player takes one cell in every region of floor next
+        to a stone, which is where the last push leaves it.
+        """
+        classes = self.weightClasses
+        stones = list(self.stones)
+
+        def placements(classIndex, free):
+            if classIndex == len(classes):
+                yield tuple(stones)
+                return
+            indices = classes[classIndex]
+            for cells in combinations(free, len(indices)):
+                for index, cell in zip(indices, cells):
+                    stones[index] = cell
+                rest = [cell for cell in free if cell not in cells]
+                yield from placements(classIndex + 1, rest)
+
+        for placement in placements(0, sorted(self.switches)):
+            seen = bytearray(self.size)
+            for stone in placement:
+                seen[stone] = 1
+            for stone in placement:
+                for cell in self.neighbors[stone]:
+                    if cell >= 0 and not seen[cell]:
+                        region = self.reachable(cell, placement)[1]
+                        for regionCell in region:
+                            seen[regionCell] = 1
+                        yield min(region), placement
+
+    def predecessors(self, state):
+        """
+        Generate every push that leads to the given state, by pulling stones.
+
+        Yields:
+            move (int): The code of the push, as yielded by `successors`.
+            cost (int): 1 plus the stone weight.
+            previousState (tuple[int, tuple[int]]): The state before the push.
+        """
+        player, stones = state
+        reach = self.reachable(player, stones)[0]
+        neighbors = self.neighbors
+        for index, stone in enumerate(stones):
+            for direction in range(4):
+                # The push moved the stone from `previous`, where the player stands
+                # after it, and the player came from `behind`
+                previous = neighbors[stone][OPPOSITE[direction]]
+                if previous < 0 or reach[previous] != 1:
+                    continue
+                behind = neighbors[previous][OPPOSITE[direction]]
+                if behind < 0 or reach[behind] != 1:
+                    continue
+                newStones = stones[:index] + (previous,) + stones[index + 1 :]
+                yield previous * 4 + direction, 1 + self.weights[index], (
+                    behind,
+                    newStones,
+                )
+
+    def walk(self, start, goal, stones):
+        """
+        The directions of a shortest walk from `start` to `goal` around the stones.
+        """
+        previous = {start: None}
+        queue = deque([start])
+        while goal not in previous:
+            cell = queue.popleft()
+            for direction, nextCell in enumerate(self.neighbors[cell]):
+                if (
+                    nextCell >= 0
+                    and nextCell not in previous
+                    and nextCell not in stones
+                ):
+                    previous[nextCell] = (cell, direction)
+                    queue.append(nextCell)
+
+        directions = []
+        while previous[goal] is not None:
+            goal, direction = previous[goal]
+            directions.append(direction)
+        return directions[::-1]
+
+    def moveCount(self, moves):
+        size = 4 * self.size
+        return sum(move // size + 1 for move in moves)
+
+    def pathString(self, moves):
+        """
+        Replay the pushes from the initial state, walking the player up to each one.
+        """
+        path = []
+        player, stones = self.initialState()
+        for move in moves:
+            pushes, move = divmod(move, 4 * self.size)
+            stone, direction = divmod(move, 4)
+
+            # The stone goes straight on until it enters a goal room, like in
+            # successors
+            index = stones.index(stone)
+            directions = [direction]
+            cell = self.neighbors[stone][direction]
+            while len(directions) <= pushes:
+                route = None
+                if self.goalMacros:
+                    route = self.roomRoute(cell, direction, stones, index)
+                if route is not None:
+                    directions.extend(route)
+                    break
+                directions.append(direction)
+                cell = self.neighbors[cell][direction]
+
+            # The player walks around the stone whenever the route turns
+            for push in directions:
+                behind = self.neighbors[stone][OPPOSITE[push]]
+                for step in self.walk(player, behind, stones):
+                    path.append(MOVE_CHARS[step])
+                path.append(MOVE_CHARS[push | PUSH])
+                player, stone = stone, self.neighbors[stone][push]
+                stones = stones[:index] + (stone,) + stones[index + 1 :]
+        return "".join(path)
@@ -0,0 +1,86 @@
+from array import array
+
+GOLDEN = 0x9E3779B97F4A7C15  # 2^64 divided by the golden ratio, made odd
+MASK = (1 << 64) - 1
+WAYS = 2  # Slots a key may take
+
+
+class TranspositionTable:
+    """
+    A fixed-size table of search results for packed state keys.
+
+    Each key hashes to a bucket of `WAYS` adjacent slots, see `bucket`, and may
+    take any of them. When the bucket is full, the entry left over from an older
+    iteration, or else the one found farthest from the root, makes room; an entry
+    found closer to the root than the new one (so standing for a larger subtree)
+    is never replaced within an iteration.
+
+    Every entry holds the lowest path cost the state was reached with in its
+    iteration and the best known lower bound on its cost to the goal. With
+    `keepStates`, it also holds its state in `states`, for keys that are hashes
+    (see `Board.checkedKey`): two states with the same hash share an entry, and
+    the caller compares the states before trusting it.
+    """
+
+    def __init__(self, size, keepStates=False):
+        self.buckets = max(size // WAYS, 1)
+        self.size = self.buckets * WAYS
+        size = self.size
+        self.keys = [None] * size
+        self.states = [None] * size if keepStates else None
+        self.depth = array("i", bytes(4 * size))
+        self.g = array("q", bytes(8 * size))
+        self.h = array("d", bytes(8 * size))  # May be infinite for dead ends
+        self.iteration = array("i", bytes(4 * size))
+
+    def bucket(self, key):
+        """
+        The first slot of the bucket of `key`: the high bits of the 64-bit hash of
+        `key` times `GOLDEN`, scaled to the number of buckets.
+
+        Taking `key % size` instead folds the high bits of a packed key onto the
+        low ones with small factors when `size` is close to a power of two, and
+        lets whole families of states share a few slots.
+        """
+        return (((hash(key) * GOLDEN) & MASK) * self.buckets >> 64) * WAYS
+
+    def lookup(self, key):
+        """
+        Return the slot holding `key`, or -1 when it is not in the table.
+        """
+        first = self.bucket(key)
+        keys = self.keys
+        for slot in range(first, first + WAYS):
+            if keys[slot] == key:
+                return slot
+        return -1
+
+    def store(self, key, depth, g, h, iteration, state=None):
+        """
+        Record a visit of `key`, unless more valuable entries own its bucket.
+        """
+        first = self.bucket(key)
+        keys = self.keys
+        victim = None
+        for slot in range(first, first + WAYS):
+            if keys[slot] == key or keys[slot] is None:
+                victim = slot
+                break
+            if self.iteration[slot] != iteration:
+                victim = slot
+            elif victim is None or (
+                self.iteration[victim] == iteration
+                and self.depth[slot] > self.depth[victim]
+            ):
+                victim = slot
+        if keys[victim] != key and keys[victim] is not None:
+            if self.iteration[victim] == iteration and self.depth[victim] < depth:
+                return
+
+        keys[victim] = key
+        self.depth[victim] = depth
+        self.g[victim] = g
+        self.h[victim] = h
+        self.iteration[victim] = iteration
+        if self.states is not None:
+            self.states[victim] = state
@@ -0,0 +1,103 @@
+import random
+
+from Algorithms.Board import Board, PUSH
+
+
+class ZobristBoard(Board):
+    """
+    A board whose state keys are Zobrist hashes, updated in O(1) by every move.
+
+    Every cell has a random 64-bit value for the player and one for a stone of
+    each weight, and the hash of a state is the XOR of the values of its player
+    and stones. A state is a tuple `(player, stones, hash)`: a step XORs out the
+    old player cell and XORs in the new one, a push does the same for the stone.
+    Stones of equal weight share their values, so swapping them keeps the hash,
+    like `Board.key`.
+
+    The values are drawn from generators seeded with fixed strings, so a state has
+    the same hash in every run and the hashes can key caches on disk.
+
+    `key` returns the hash alone, so two states may share a key. Every search
+    stores the state itself next to its key, in its `NodeStore`,
+    `TranspositionTable` or visited map, and checks it with `checkedKey` when a
+    hash is found again. The state is already built, so storing it costs a
+    reference, and comparing it (see `sameState`) only sorts stones when the
+    tuples differ; the packed `Board.key` is only computed for a real collision.
+
+    Attributes:
+        playerKeys (list[int]): The value of the player on each cell.
+        stoneKeys (dict[int, list[int]]): For every weight, the value of a stone
+            of that weight on each cell.
+    """
+
+    exactKeys = False
+
+    def __init__(self, weights, grid):
+        super().__init__(weights, grid)
+        self.playerKeys = self._randomKeys("player")
+        self.stoneKeys = {
+            weight: self._randomKeys(f"stone-{weight}") for weight in set(self.weights)
+        }
+
+    def _randomKeys(self, seed):
+        generator = random.Random(seed)
+        return [generator.getrandbits(64) for _ in range(self.size)]
+
+    def hash(self, player, stones):
+        """
+        Compute the hash of a state from scratch.
+        """
+        value = self.playerKeys[player]
+        for index, stone in enumerate(stones):
+            value ^= self.stoneKeys[self.weights[index]][stone]
+        return value
+
+    def initialState(self):
+        return self.player, self.stones, self.hash(self.player, self.stones)
+
+    def key(self, state):
+        return state[2]
+
+    def sameState(self, state, other):
+        return state[0] == other[0] and (
+            state[1] == other[1] or self.canonical(state[1]) == self.canonical(other[1])
+        )
+
+    def packedKey(self, state):
+        return super().key(state[:2])
+
+    def unpack(self, key):
+        """
+        Inverse of `packedKey`.
+        """
+        player, stones = super().unpack(key)
+        return player, stones, self.hash(player, stones)
+
+    def successors(self, state):
+        """
+        Generate every legal move like `Board.successors`, updating the hash.
+        """
+        player, stones, value = state
+        playerKeys = self.playerKeys
+        value ^= playerKeys[player]
+        pushTargets = self.pushTargets[player]
+        for direction, nextCell in enumerate(self.neighbors[player]):
+            if nextCell < 0:
+                continue
+            if nextCell not in stones:
+                yield direction, 1, (nextCell, stones, value ^ playerKeys[nextCell])
+                continue
+
+            target = pushTargets[direction]
+            if target < 0 or self.dead[target] or target in stones:
+                continue
+            index = stones.index(nextCell)
+            newStones = stones[:index] + (target,) + stones[index + 1 :]
+            if self.isDeadlock(newStones, target):
+                continue
+            weight = self.weights[index]
+            cellKeys = self.stoneKeys[weight]
+            newValue = (
+                value ^ playerKeys[nextCell] ^ cellKeys[nextCell] ^ cellKeys[target]
+            )
+            yield direction | PUSH, 1 + weight, (nextCell, newStones, newValue)
@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+from collections import deque
+
+from Algorithms.Board import Board
+from Algorithms.Bitboard import Bitboard
+from Algorithms.ZobristBoard import ZobristBoard
+
+ENGINES = {"board": Board, "bitboard": Bitboard, "zobrist": ZobristBoard}
+TIME_LIMIT = 1.0  # seconds of expansion per maze and engine
+
+
+def readMaze(file):
+    with open(f"Mazes/{file}", "r") as f:
+        weights = list(map(int, f.readline().split()))
+        maze = [list(line) for line in f.read().splitlines()]
+    return weights, maze
+
+
+def expansionsPerSecond(engine, weights, maze):
+    board = engine(weights, maze)
+    start = board.initialState()
+    queue = deque([start])
+    # Keys that are hashes are checked like the solvers do, see Board.checkedKey
+    exact = board.exactKeys
+    visited = {board.key(start): None if exact else start}
+    expansions = 0
+
+    startTime = time.perf_counter()
+    while queue and time.perf_counter() - startTime < TIME_LIMIT:
+        state = queue.popleft()
+        expansions += 1
+        board.isGoal(state)
+        for move, cost, newState in board.successors(state):
+            key = board.key(newState)
+            if not exact and key in visited:
+                key = board.checkedKey(key, newState, visited[key])
+            if key not in visited:
+                visited[key] = None if exact else newState
+                queue.append(newState)
+
+    return expansions / (time.perf_counter() - startTime)
+
+
+files = sorted(
+    file
+    for file in os.listdir("Mazes")
+    if file.startswith("input-") and file.endswith(".txt")
+)
+files = [file for file in files if len(sys.argv) < 2 or file in sys.argv[1:]]
+
+# Expansions per second of every engine, and its speedup over the first one
+print(f"{'maze':<16}" + "".join(f"{name:>20}" for name in ENGINES))
+for file in files:
+    weights, maze = readMaze(file)
+    rates = [expansionsPerSecond(engine, weights, maze) for engine in ENGINES.values()]
+    print(
+        f"{file:<16}"
+        + "".join(f"{rate:>12.0f} ({rate / rates[0]:.2f}x)" for rate in rates)
+    )
@@ -1,8 +1,12 @@
 import os
+import shutil
 
 if os.path.exists("settings.json"):
     os.remove("settings.json")
 
+if os.path.exists("Cache"):
+    shutil.rmtree("Cache")
+
 os.chdir("Mazes")
 
 for file in os.listdir():
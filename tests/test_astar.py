@@ -0,0 +1,35 @@
+import os
+import unittest
+
+from Algorithms import AStar
+from Algorithms.PushBoard import PushBoard
+
+MAZES = os.path.join(os.path.dirname(__file__), "..", "Mazes")
+
+
+def readMaze(number):
+    with open(os.path.join(MAZES, f"input-{number:02d}.txt"), "r") as f:
+        weights = list(map(int, f.readline().split()))
+        maze = [list(line) for line in f.read().splitlines()]
+    return weights, maze
+
+
+class IDAStarTest(unittest.TestCase):
+    def test_optimal_over_steps(self):
+        for number, cost in ((1, 429), (4, 738), (5, 51)):
+            with self.subTest(maze=number):
+                steps, weight = AStar.getIDAStarOutput(*readMaze(number))[:2]
+                self.assertEqual(steps + weight, cost)
+
+    def test_bundled_mazes_over_pushes(self):
+        for number in range(1, 11):
+            with self.subTest(maze=number):
+                weights, maze = readMaze(number)
+                result = AStar.getIDAStarOutput(weights, maze, engine=PushBoard)
+                expected = AStar.getOutput(*readMaze(number), engine=PushBoard)
+                self.assertIsNotNone(result)
+                self.assertEqual(result[1], expected[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import unittest
+from unittest import mock
+
+from Algorithms import BeamSearch
+
+MAZES = os.path.join(os.path.dirname(__file__), "..", "Mazes")
+
+
+def readMaze(number):
+    with open(os.path.join(MAZES, f"input-{number:02d}.txt"), "r") as f:
+        weights = list(map(int, f.readline().split()))
+        maze = [list(line) for line in f.read().splitlines()]
+    return weights, maze
+
+
+class BeamSearchTest(unittest.TestCase):
+    def test_bundled_mazes(self):
+        # input-07 needs a narrower beam, see BeamSearch.getOutput
+        for number in (1, 2, 3, 4, 5, 6, 8, 9, 10):
+            with self.subTest(maze=number):
+                result = BeamSearch.getOutput(*readMaze(number))
+                self.assertIsNotNone(result)
+                self.assertEqual(result[0], len(result[5]))
+
+    def test_narrow_beam(self):
+        self.assertIsNotNone(BeamSearch.getOutput(*readMaze(7), width=100))
+
+    def test_gives_up_after_max_layers(self):
+        with mock.patch.object(BeamSearch, "MAX_LAYERS", 3):
+            self.assertIsNone(BeamSearch.getOutput(*readMaze(6)))
+
+
+if __name__ == "__main__":
+    unittest.main()
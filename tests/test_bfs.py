@@ -0,0 +1,41 @@
+import os
+import unittest
+
+from Algorithms import BFS
+from Algorithms.PushBoard import PushBoard
+
+MAZES = os.path.join(os.path.dirname(__file__), "..", "Mazes")
+
+
+def readMaze(number):
+    with open(os.path.join(MAZES, f"input-{number:02d}.txt"), "r") as f:
+        weights = list(map(int, f.readline().split()))
+        maze = [list(line) for line in f.read().splitlines()]
+    return weights, maze
+
+
+class BidirectionalTest(unittest.TestCase):
+    def test_same_pushes_as_forward(self):
+        for number in (1, 4, 5, 8):
+            with self.subTest(maze=number):
+                result = BFS.getBidirectionalOutput(*readMaze(number))
+                forward = BFS.getOutput(*readMaze(number), engine=PushBoard)
+                self.assertEqual(
+                    sum(char.isupper() for char in result[5]),
+                    sum(char.isupper() for char in forward[5]),
+                )
+
+    def test_too_many_goal_states(self):
+        # input-04 has 6 solved states, one too many for this limit
+        limit = BFS.GOAL_STATE_LIMIT
+        BFS.GOAL_STATE_LIMIT = 5
+        try:
+            result = BFS.getBidirectionalOutput(*readMaze(4))
+        finally:
+            BFS.GOAL_STATE_LIMIT = limit
+        forward = BFS.getOutput(*readMaze(4), engine=PushBoard)
+        self.assertEqual(result[:3], forward[:3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import tempfile
+import unittest
+
+from Algorithms import BFS, UCS
+from Algorithms.Board import Board
+from Algorithms.DeadlockTable import DeadlockTable
+from Algorithms.LearningBoard import LearningBoard, LearningPushBoard
+
+# The stone pushed from (4, 5) onto (3, 5) leans on a stone that leans back on
+# it along one axis only, so nothing is frozen
+LEANING = [
+    "#########",
+    "#   .   #",
+    "#  # ## #",
+    "#  $*.* #",
+    "#    $  #",
+    "#   @   #",
+    "#########",
+]
+
+
+class FreezeDeadlockTest(unittest.TestCase):
+    def test_leaning_stones_are_not_frozen(self):
+        board = Board([1, 1, 1, 1], [list(row) for row in LEANING])
+        stones = list(board.stones)
+        stones[stones.index(4 * board.width + 5)] = 3 * board.width + 5
+        self.assertFalse(board.isFreezeDeadlock(tuple(stones), 3 * board.width + 5))
+
+    def test_optimal_solutions_are_kept(self):
+        steps, weight = BFS.getOutput([1, 1, 1, 1], [list(row) for row in LEANING])[:2]
+        self.assertEqual(steps, 11)
+        steps, weight = UCS.getOutput([1, 1, 1, 1], [list(row) for row in LEANING])[:2]
+        self.assertEqual(steps + weight, 15)
+
+
+class DeadlockTableTest(unittest.TestCase):
+    def test_learning_engines_solve_optimally(self):
+        for engine in (LearningBoard, LearningPushBoard):
+            with self.subTest(engine=engine.__name__):
+                grid = [list(row) for row in LEANING]
+                self.assertIsNotNone(engine([1, 1, 1, 1], grid).deadlocks)
+                steps, weight = UCS.getOutput([1, 1, 1, 1], grid, engine=engine)[:2]
+                if engine is LearningBoard:
+                    self.assertEqual(steps + weight, 15)
+
+    def test_neighbors_stay_within_rows(self):
+        board = Board([1, 1, 1, 1], [list(row) for row in LEANING])
+        table = DeadlockTable(board, None)
+        # The last cell of row 3 and the first of row 4 are not neighbors
+        lastCell = 4 * board.width - 1
+        self.assertEqual(table.around({lastCell + 1}, lastCell), [])
+        self.assertEqual(table.around({lastCell - 1}, lastCell), [lastCell - 1])
+
+    def test_every_result_is_saved(self):
+        board = Board([1, 1, 1, 1], [list(row) for row in LEANING])
+        with tempfile.TemporaryDirectory() as cacheDir:
+            table = DeadlockTable(board, cacheDir)
+            table.learn((10, 11))
+            for configuration in ((12, 13), (14, 15), (20, 21)):
+                table.markSafe(configuration)
+            loaded = DeadlockTable(board, cacheDir)
+            self.assertEqual(loaded.safe, table.safe)
+            self.assertEqual(loaded.patterns, table.patterns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import unittest
+
+from Algorithms import DFS
+
+MAZES = os.path.join(os.path.dirname(__file__), "..", "Mazes")
+
+
+def readMaze(number):
+    with open(os.path.join(MAZES, f"input-{number:02d}.txt"), "r") as f:
+        weights = list(map(int, f.readline().split()))
+        maze = [list(line) for line in f.read().splitlines()]
+    return weights, maze
+
+
+class DepthFirstSearchTest(unittest.TestCase):
+    def assertSolves(self, number):
+        result = DFS.getOutput(*readMaze(number))
+        self.assertIsNotNone(result, f"input-{number:02d}")
+        steps, path = result[0], result[5]
+        self.assertEqual(steps, len(path))
+        self.assertLessEqual(steps, DFS.DEPTH_THRESHOLD)
+
+    def test_bundled_mazes(self):
+        # Every bundled maze but input-07, which is out of reach of a search
+        # this blind (input-09 has its own test)
+        for number in (1, 2, 3, 4, 5, 6, 8, 10):
+            with self.subTest(maze=number):
+                self.assertSolves(number)
+
+    def test_iterative_deepening(self):
+        for number in (2, 4):
+            with self.subTest(maze=number):
+                self.assertIsNotNone(
+                    DFS.getOutput(*readMaze(number), iterativeDeepening=True)
+                )
+
+    def test_symmetric_states_keep_the_solution(self):
+        # Merging states that only swap stones of equal weight made the
+        # visit-once search run out of states on this maze
+        self.assertSolves(9)
+
+
+if __name__ == "__main__":
+    unittest.main()
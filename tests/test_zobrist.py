@@ -0,0 +1,53 @@
+import os
+import unittest
+
+from Algorithms import AStar, BFS, BeamSearch, DFS, UCS
+from Algorithms.ZobristBoard import ZobristBoard
+
+MAZES = os.path.join(os.path.dirname(__file__), "..", "Mazes")
+
+
+def readMaze(number):
+    with open(os.path.join(MAZES, f"input-{number:02d}.txt"), "r") as f:
+        weights = list(map(int, f.readline().split()))
+        maze = [list(line) for line in f.read().splitlines()]
+    return weights, maze
+
+
+class CollidingBoard(ZobristBoard):
+    # Only 16 different keys, so that most states share theirs with others
+    def key(self, state):
+        return state[2] % 16
+
+
+class HashKeyTest(unittest.TestCase):
+    def test_collisions_keep_optimal_solutions(self):
+        for number in (2, 3):
+            weights, maze = readMaze(number)
+            for solver in (BFS.getOutput, UCS.getOutput, AStar.getIDAStarOutput):
+                with self.subTest(maze=number, solver=solver.__module__):
+                    expected = solver(weights, maze)[:2]
+                    for engine in (ZobristBoard, CollidingBoard):
+                        self.assertEqual(
+                            solver(weights, maze, engine=engine)[:2], expected
+                        )
+
+    def test_collisions_prune_nothing(self):
+        for number in (2, 3, 5):
+            weights, maze = readMaze(number)
+            with self.subTest(maze=number, solver="DFS"):
+                self.assertEqual(
+                    DFS.getOutput(weights, maze, engine=CollidingBoard)[:3],
+                    DFS.getOutput(weights, maze, engine=ZobristBoard)[:3],
+                )
+            # The beam may generate a state that collided again once the state
+            # that took its hash is forgotten, see BeamSearch.checkedKey
+            with self.subTest(maze=number, solver="BeamSearch"):
+                self.assertEqual(
+                    BeamSearch.getOutput(weights, maze, engine=CollidingBoard)[:2],
+                    BeamSearch.getOutput(weights, maze, engine=ZobristBoard)[:2],
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()